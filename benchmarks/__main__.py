@@ -0,0 +1,4 @@
+import sys
+from .run import main
+
+sys.exit(main())
@@ -0,0 +1,163 @@
+import json
+import os
+import numpy as np
+from trading import blackscholes
+
+# Provider responses for the stand-in server. Synthetic responses copy the
+# providers' JSON layouts field for field and are deterministic per size, so
+# runs on different machines and versions decode the same bytes. Responses
+# captured with `python -m benchmarks --record` are stored in recorded_dir
+# and replayed verbatim.
+recorded_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded")
+seed = 20240101
+end_time = 1735689600  # 2025-01-01 00:00 UTC; fixed so payloads do not change between runs
+
+# Seconds per candle of each CryptoCompare endpoint
+cryptocompare_intervals = {
+    "histominute": 60,
+    "histohour": 3600,
+    "histoday": 86400
+}
+
+# Function to generate a random-walk OHLCV series of n candles, the last opening at last_time
+def random_candles(n, interval, last_time=None):
+    if last_time is None:
+        last_time = end_time - interval
+    rng = np.random.default_rng(seed + n + last_time)
+    times = last_time - interval * np.arange(n - 1, -1, -1, dtype=np.int64)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.002, n)))
+    open_ = np.concatenate(([100.0], close[:-1]))
+    spread = np.abs(rng.normal(0.0, 0.001, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.gamma(2.0, 500.0, n).round(4)
+    return times, open_.round(4), high.round(4), low.round(4), close.round(4), volume
+
+# Function to build a CryptoCompare /data/v2/histo* response (to_ts: open time of the last candle)
+def cryptocompare_history(n, endpoint, to_ts=None):
+    times, open_, high, low, close, volume = random_candles(n, cryptocompare_intervals[endpoint], to_ts)
+    candles = [
+        {"time": int(t), "high": h, "low": l, "open": o, "volumefrom": v, "volumeto": round(v * c, 4),
+         "close": c, "conversionType": "direct", "conversionSymbol": ""}
+        for t, o, h, l, c, v in zip(times.tolist(), open_.tolist(), high.tolist(), low.tolist(),
+                                    close.tolist(), volume.tolist())
+    ]
+    return {
+        "Response": "Success",
+        "Message": "",
+        "HasWarning": False,
+        "Type": 100,
+        "RateLimit": {},
+        "Data": {"Aggregated": False, "TimeFrom": candles[0]["time"] if candles else None,
+                 "TimeTo": candles[-1]["time"] if candles else None, "Data": candles}
+    }
+
+# Function to build a Yahoo Finance /v8/finance/chart response (what yfinance's history() parses)
+def yahoo_chart(n, symbol, interval=60):
+    times, open_, high, low, close, volume = random_candles(n, interval)
+    return {
+        "chart": {
+            "result": [{
+                "meta": {"currency": "USD", "symbol": symbol, "exchangeName": "PCX", "instrumentType": "ETF",
+                         "gmtoffset": -18000, "timezone": "EST", "exchangeTimezoneName": "America/New_York",
+                         "dataGranularity": f"{interval // 60}m"},
+                "timestamp": times.tolist(),
+                "indicators": {"quote": [{"open": open_.tolist(), "high": high.tolist(), "low": low.tolist(),
+                                          "close": close.tolist(), "volume": volume.round().astype(np.int64).tolist()}]}
+            }],
+            "error": None
+        }
+    }
+
+# Function to build a marketdata.app /v1/options/chain response of about n contracts:
+# calls and puts over a strike ladder around the spot for a set of weekly expirations
+def marketdata_chain(n, ticker, spot=500.0):
+    rng = np.random.default_rng(seed + n)
+    expirations = max(1, min(52, n // 200))
+    strikes = max(1, n // (2 * expirations))
+    expiration = end_time + 86400 * 7 * np.repeat(np.arange(1, expirations + 1), 2 * strikes)
+    strike = np.tile(np.repeat(spot + np.arange(strikes) - strikes // 2, 2), expirations).astype(float)
+    is_call = np.tile([True, False], expirations * strikes)
+    years = (expiration - end_time) / blackscholes.seconds_per_year
+    iv = 0.15 + 0.1 * np.abs(strike / spot - 1.0) + rng.normal(0.0, 0.005, len(strike))
+    mid = blackscholes.price(spot, strike, years, iv, is_call)
+    greeks = blackscholes.greeks(spot, strike, years, iv, is_call)
+    spread = np.maximum(0.01, mid * 0.02)
+    side = np.where(is_call, "call", "put")
+    symbol = [f"{ticker}{e}{s[0].upper()}{int(k * 1000):08d}" for e, s, k in zip(expiration.tolist(), side, strike)]
+    volume = rng.poisson(200, len(strike))
+    rounded = lambda values, digits=4: np.round(values, digits).tolist()
+    return {
+        "s": "ok",
+        "optionSymbol": symbol,
+        "underlying": [ticker] * len(strike),
+        "expiration": expiration.tolist(),
+        "side": side.tolist(),
+        "strike": strike.tolist(),
+        "firstTraded": [end_time - 86400 * 90] * len(strike),
+        "dte": ((expiration - end_time) // 86400).tolist(),
+        "updated": [end_time] * len(strike),
+        "bid": rounded(mid - spread / 2, 2),
+        "bidSize": rng.integers(1, 500, len(strike)).tolist(),
+        "mid": rounded(mid, 3),
+        "ask": rounded(mid + spread / 2, 2),
+        "askSize": rng.integers(1, 500, len(strike)).tolist(),
+        "last": rounded(mid, 2),
+        "openInterest": rng.integers(0, 20000, len(strike)).tolist(),
+        "volume": volume.tolist(),
+        "inTheMoney": (np.where(is_call, strike < spot, strike > spot)).tolist(),
+        "intrinsicValue": rounded(np.maximum(np.where(is_call, spot - strike, strike - spot), 0.0), 2),
+        "extrinsicValue": rounded(mid - np.maximum(np.where(is_call, spot - strike, strike - spot), 0.0), 2),
+        "underlyingPrice": [spot] * len(strike),
+        "iv": rounded(iv),
+        "delta": rounded(greeks["delta"]),
+        "gamma": rounded(greeks["gamma"], 5),
+        "theta": rounded(greeks["theta"]),
+        "vega": rounded(greeks["vega"]),
+        "rho": rounded(greeks["rho"])
+    }
+
+# Function to build the response for a request path ("/data/v2/histominute",
+# "/v8/finance/chart/SPY", "/v1/options/chain/SPY/") at size n. None if unknown.
+def synthetic_response(path, n):
+    parts = [part for part in path.split("/") if part]
+    if parts[:2] == ["data", "v2"] and len(parts) == 3 and parts[2] in cryptocompare_intervals:
+        return cryptocompare_history(n, parts[2])
+    if parts[:3] == ["v8", "finance", "chart"] and len(parts) == 4:
+        return yahoo_chart(n, parts[3])
+    if parts[:3] == ["v1", "options", "chain"] and len(parts) == 4:
+        return marketdata_chain(n, parts[3])
+    return None
+
+# Function to build a paged CryptoCompare response the way the API answers
+# toTs requests: limit + 1 candles ending at toTs. None for other paths.
+def paged_response_body(path, query):
+    parts = [part for part in path.split("/") if part]
+    if parts[:2] != ["data", "v2"] or len(parts) != 3 or parts[2] not in cryptocompare_intervals or "toTs" not in query:
+        return None
+    interval = cryptocompare_intervals[parts[2]] * int(query.get("aggregate", 1))
+    to_ts = int(query["toTs"]) // interval * interval
+    payload = cryptocompare_history(int(query.get("limit", 1440)) + 1, parts[2], to_ts)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+# Function to name the recorded fixture file of a request path
+def recorded_path(path):
+    return os.path.join(recorded_dir, "_".join(part for part in path.split("/") if part) + ".json")
+
+# Function to encode the body served for a path: the recorded response when size
+# is "recorded", otherwise the synthetic one. None if there is nothing to serve.
+def response_body(path, size):
+    if size == "recorded":
+        file_path = recorded_path(path)
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, "rb") as f:
+            return f.read()
+    payload = synthetic_response(path, int(size))
+    return json.dumps(payload, separators=(",", ":")).encode() if payload is not None else None
+
+# Function to save a live response for replay (run with network access)
+def record(path, body):
+    os.makedirs(recorded_dir, exist_ok=True)
+    with open(recorded_path(path), "wb") as f:
+        f.write(body)
@@ -0,0 +1,275 @@
+import argparse
+import contextlib
+import gc
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+import pandas as pd
+from trading import analysis
+from trading import candlestore
+from trading import crypto
+from trading import fetchengine
+from trading import ingest
+from trading import optionchain
+from trading import options
+from . import fixtures
+from .server import FixtureServer
+
+results_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Stages timed for each case, in pipeline order
+stage_names = ["fetch", "decode", "frame", "history", "stats", "probabilities", "strategies", "backfill", "load"]
+
+# Cases: provider path replayed by the server and the sizes (candles or contracts) swept.
+# yahoo/chart_decode only decodes and frames the chart JSON (yfinance itself is
+# not called, so its own parsing and the stock store merge are not timed).
+candle_sizes = [10, 1_000, 100_000, 1_000_000]
+cases = {
+    "cryptocompare/histominute": ("/data/v2/histominute", candle_sizes),
+    "cryptocompare/histohour": ("/data/v2/histohour", candle_sizes[:-1]),
+    "cryptocompare/histoday": ("/data/v2/histoday", candle_sizes[:-1]),
+    "yahoo/chart_decode": ("/v8/finance/chart/SPY", candle_sizes),
+    "marketdata/options_chain": ("/v1/options/chain/SPY/", [100, 10_000, 100_000]),
+    "cryptocompare/backfill": ("/data/v2/histominute", [10_000, 525_600])  # Sizes in 1m bars; 525,600 is a year
+}
+
+# Live endpoints saved by --record, keyed by the path they are replayed under
+record_sources = {
+    "/data/v2/histominute": ("https://min-api.cryptocompare.com/data/v2/histominute",
+                             {"fsym": "BTC", "tsym": "USD", "limit": 2000, "api_key": crypto.api_key}),
+    "/data/v2/histohour": ("https://min-api.cryptocompare.com/data/v2/histohour",
+                           {"fsym": "BTC", "tsym": "USD", "limit": 2000, "api_key": crypto.api_key}),
+    "/data/v2/histoday": ("https://min-api.cryptocompare.com/data/v2/histoday",
+                          {"fsym": "BTC", "tsym": "USD", "limit": 2000, "api_key": crypto.api_key}),
+    "/v8/finance/chart/SPY": ("https://query2.finance.yahoo.com/v8/finance/chart/SPY",
+                              {"interval": "1m", "range": "7d"}),
+    "/v1/options/chain/SPY/": ("https://api.marketdata.app/v1/options/chain/SPY/", {"token": options.api_key})
+}
+
+headers = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124",
+    "Accept": "application/json"
+}
+candle_counts = [10, 50, 200]
+option_periods = [10, 20]
+history_days = 20  # Dates in the options history built from one chain
+regression_ratio = 1.25
+regression_floor = 0.001  # Seconds; ignore slowdowns smaller than this
+
+# Function to time fn over `repeat` runs, returning (result, min seconds, median seconds)
+def measure(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        result = None  # Release the previous result before the next run
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings), statistics.median(timings)
+
+# Function to build a candle DataFrame shaped like yfinance's history() output from a chart response
+def chart_frame(data):
+    result = data["chart"]["result"][0]
+    quote = result["indicators"]["quote"][0]
+    index = pd.to_datetime(result["timestamp"], unit="s", utc=True).tz_convert(result["meta"]["exchangeTimezoneName"])
+    return pd.DataFrame({
+        "Open": quote["open"],
+        "High": quote["high"],
+        "Low": quote["low"],
+        "Close": quote["close"],
+        "Volume": quote["volume"]
+    }, index=index)
+
+# Function to run one case at one size through every stage it has
+def run_case(engine, base_url, path, repeat):
+    url = base_url + path
+    engine.get(url, headers=headers, label=url)  # Warm the server's body cache and the connection
+    timings = {}
+
+    def timed(stage, fn):
+        result, best, median = measure(fn, repeat)
+        timings[stage] = {"min": best, "median": median}
+        return result
+
+    response = timed("fetch", lambda: engine.get(url, headers=headers, label=url))
+    if response is None or response.status_code != 200:
+        return None
+    if path.startswith("/v1/options/chain/"):
+        columns = timed("decode", lambda: ingest.marketdata_chain(response.content))
+        chain = timed("frame", lambda: options.chain_frame(columns, "SPY"))
+        history = timed("history", lambda: optionchain.OptionChainHistory(
+            [(f"day{day:03d}", chain) for day in range(history_days)]))
+        current_mid = chain["mid"].mean()
+        timed("stats", lambda: options.calculate_window_stats(history, option_periods))
+        timed("probabilities", lambda: options.calculate_window_probabilities(history, option_periods, current_mid))
+        timed("strategies", lambda: options.suggest_strategies(chain, as_of=fixtures.end_time))
+        return timings
+
+    if path.startswith("/v8/finance/chart/"):
+        data = timed("decode", lambda: ingest.loads(response.content))
+        frame = timed("frame", lambda: chart_frame(data))
+    else:
+        columns = timed("decode", lambda: ingest.cryptocompare_candles(response.content))
+        frame = timed("frame", lambda: crypto.candles_frame(columns))
+    counts = sorted({count for count in candle_counts if count <= len(frame)} | {len(frame)})
+    current_close = frame["Close"].iloc[-1]
+    timed("stats", lambda: analysis.calculate_window_stats(frame, counts))
+    timed("probabilities", lambda: analysis.calculate_window_probabilities(frame, counts, current_close))
+    return timings
+
+# Function to time a paged 1m backfill of `bars` bars into a scratch candle store,
+# then loading the stored series back
+def run_backfill(base_url, bars, repeat):
+    store = tempfile.mkdtemp()
+    saved = crypto.base_url, crypto.engine, candlestore.store_dir
+    crypto.base_url, candlestore.store_dir = base_url, store
+    crypto.engine = fetchengine.FetchEngine([(1_000_000, 1)], max_workers=8, retries=0)
+    timings = {}
+
+    def backfill():
+        shutil.rmtree(os.path.join(store, "cryptocompare"), ignore_errors=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return crypto.backfill("BTC", "USD", 60, bars * 60 / 86400)
+
+    try:
+        stored, best, median = measure(backfill, repeat)
+        timings["backfill"] = {"min": best, "median": median}
+        _, best, median = measure(lambda: candlestore.load_candles("cryptocompare", "BTC-USD", "histominute1"), repeat)
+        timings["load"] = {"min": best, "median": median}
+        return timings if stored else None
+    finally:
+        crypto.base_url, crypto.engine, candlestore.store_dir = saved
+        shutil.rmtree(store, ignore_errors=True)
+
+# Function to run every selected case and size against the stand-in server
+def run_benchmarks(selected, max_size, repeat):
+    server = FixtureServer().start()
+    engine = fetchengine.FetchEngine([(1_000_000, 1)], max_workers=1, retries=0)
+    results = {}
+    try:
+        for name in selected:
+            path, sizes = cases[name]
+            sizes = [size for size in sizes if size <= max_size]
+            if name != "cryptocompare/backfill" and os.path.exists(fixtures.recorded_path(path)):
+                sizes.append("recorded")
+            results[name] = {}
+            for size in sizes:
+                if name == "cryptocompare/backfill":
+                    timings = run_backfill(server.url(size), size, repeat)
+                else:
+                    timings = run_case(engine, server.url(size), path, repeat)
+                if timings is None:
+                    print(f"{name} [{size}]: no response")
+                    continue
+                results[name][str(size)] = timings
+                print_row(name, size, timings)
+    finally:
+        server.stop()
+    return results
+
+# Function to print one result row (min milliseconds per stage)
+def print_row(name, size, timings):
+    cells = "  ".join(f"{stage}={timings[stage]['min'] * 1000:.2f}ms" for stage in stage_names if stage in timings)
+    print(f"{name:<28} {str(size):>9}  {cells}")
+
+# Function to describe the code version being measured
+def code_version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+# Function to store a run's results under results_dir, returning the file path
+def save_results(results, repeat):
+    os.makedirs(results_dir, exist_ok=True)
+    version = code_version()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    record = {
+        "version": version,
+        "timestamp": stamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results
+    }
+    file_path = os.path.join(results_dir, f"{stamp}_{version}.json")
+    with open(file_path, "w") as f:
+        json.dump(record, f, indent=1)
+    return file_path
+
+# Function to find the most recent stored run other than `exclude`
+def previous_results(exclude=None):
+    paths = sorted(path for path in glob.glob(os.path.join(results_dir, "*.json")) if path != exclude)
+    return paths[-1] if paths else None
+
+# Function to compare two runs stage by stage, printing and returning the regressions
+def compare(baseline, results):
+    regressions = []
+    for name, sizes in results.items():
+        for size, stages in sizes.items():
+            base_stages = baseline["results"].get(name, {}).get(size, {})
+            for stage, timing in stages.items():
+                if stage not in base_stages:
+                    continue
+                old, new = base_stages[stage]["min"], timing["min"]
+                if new > old * regression_ratio and new - old > regression_floor:
+                    regressions.append((name, size, stage, old, new))
+    print(f"\nCompared with {baseline['version']} ({baseline['timestamp']}):")
+    if not regressions:
+        print("  No regressions.")
+    for name, size, stage, old, new in regressions:
+        print(f"  REGRESSION {name} [{size}] {stage}: {old * 1000:.2f}ms -> {new * 1000:.2f}ms ({new / old:.2f}x)")
+    return regressions
+
+# Function to save live provider responses for replay (needs network access and API keys)
+def record_fixtures():
+    import requests
+    for path, (url, params) in record_sources.items():
+        try:
+            response = requests.get(url, params=params, headers=headers, timeout=30)
+            response.raise_for_status()
+            fixtures.record(path, response.content)
+            print(f"Recorded {path} ({len(response.content)} bytes)")
+        except Exception as e:
+            print(f"Error recording {path}: {e}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Offline stage benchmarks against a local stand-in provider server.")
+    parser.add_argument("--cases", nargs="+", choices=list(cases), default=list(cases), help="cases to run (default: all)")
+    parser.add_argument("--max-size", type=int, default=max(candle_sizes), help="largest size to run (default: 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the minimum is reported (default: 3)")
+    parser.add_argument("--compare", metavar="RESULTS", help="stored run to compare with (default: the previous run)")
+    parser.add_argument("--no-save", action="store_true", help="do not store this run's results")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 if a stage regressed")
+    parser.add_argument("--record", action="store_true", help="record live provider responses for replay, then exit")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.record:
+        record_fixtures()
+        return 0
+
+    results = run_benchmarks(args.cases, args.max_size, args.repeat)
+    saved = None if args.no_save else save_results(results, args.repeat)
+    if saved:
+        print(f"\nResults stored in {saved}")
+
+    baseline_path = args.compare or previous_results(exclude=saved)
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions = compare(json.load(f), results)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
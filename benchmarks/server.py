@@ -0,0 +1,65 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from . import fixtures
+
+# Local stand-in for the provider APIs. The response size is part of the base
+# URL: http://127.0.0.1:<port>/n/<size> followed by the provider's own path,
+# so the production code only needs its base URL overridden. Bodies are
+# encoded once per (path, size) and served from memory afterwards. CryptoCompare
+# toTs/limit paging is honoured (and not cached) so backfills can be replayed.
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real providers
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = url.path.split("/", 3)
+        if len(parts) < 4 or parts[1] != "n":
+            self.send_error(404)
+            return
+        size, path = parts[2], "/" + parts[3]
+        body = fixtures.paged_response_body(path, dict(parse_qsl(url.query)))
+        if body is None:
+            body = self.server.body(path, size)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), FixtureHandler)
+        self.bodies = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def body(self, path, size):
+        key = (path.rstrip("/"), size)
+        with self.lock:
+            if key not in self.bodies:
+                self.bodies[key] = fixtures.response_body(path, size)
+            return self.bodies[key]
+
+    # Base URL serving responses of the given size
+    def url(self, size):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/n/{size}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
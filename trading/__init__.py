@@ -0,0 +1,35 @@
+import importlib
+
+# Stable API. Names resolve on first access so `import trading` stays cheap;
+# numpy/pandas/scipy and the provider clients load only when a function that
+# needs them is used.
+api = {
+    "fetch_stock_data": ("trading.stock", "fetch_data"),
+    "fetch_crypto_data": ("trading.crypto", "fetch_data"),
+    "fetch_options_data": ("trading.options", "fetch_options_data"),
+    "fetch_historical_data": ("trading.options", "fetch_historical_data"),
+    "calculate_stats": ("trading.analysis", "calculate_stats"),
+    "calculate_window_stats": ("trading.analysis", "calculate_window_stats"),
+    "calculate_probabilities": ("trading.analysis", "calculate_probabilities"),
+    "calculate_window_probabilities": ("trading.analysis", "calculate_window_probabilities"),
+    "calculate_horizon_probabilities": ("trading.analysis", "calculate_horizon_probabilities"),
+    "calculate_window_horizon_probabilities": ("trading.analysis", "calculate_window_horizon_probabilities"),
+    "calculate_option_stats": ("trading.options", "calculate_stats"),
+    "calculate_option_probabilities": ("trading.options", "calculate_probabilities"),
+    "suggest_strategies": ("trading.options", "suggest_strategies"),
+    "calculate_cross_asset_stats": ("trading.crossasset", "cross_asset_stats"),
+    "calculate_pair_probabilities": ("trading.crossasset", "pair_probabilities"),
+}
+
+__all__ = list(api)
+
+def __getattr__(name):
+    if name not in api:
+        raise AttributeError(f"module 'trading' has no attribute {name!r}")
+    module_name, attribute = api[name]
+    value = getattr(importlib.import_module(module_name), attribute)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
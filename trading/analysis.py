@@ -0,0 +1,56 @@
+from . import metrics
+from . import montecarlo
+from . import probkernel
+from . import windowstats
+
+# Columns summarized by calculate_stats for candle data
+stats_columns = ["High", "Low", "Close", "Volume"]
+candle_counts = [10, 50, 200]
+
+# Function to calculate stats for every candle count in one vectorized pass
+@metrics.instrument("calculate_window_stats")
+def calculate_window_stats(data, counts, columns=stats_columns):
+    if data is None:
+        return {count: None for count in counts}
+    results = windowstats.window_stats(data, columns, counts)
+    return {
+        count: windowstats.stats_dict(results[i], columns) if len(data) >= count else None
+        for i, count in enumerate(counts)
+    }
+
+# Function to calculate stats
+def calculate_stats(data, count, columns=stats_columns):
+    return calculate_window_stats(data, [count], columns)[count]
+
+# Function to calculate probabilities for every candle count in one kernel pass
+@metrics.instrument("calculate_window_probabilities")
+def calculate_window_probabilities(data, counts, current_close, bands=probkernel.default_bands):
+    if data is None:
+        return {count: None for count in counts}
+    return probkernel.window_probabilities(data["Close"].to_numpy(), counts, current_close, bands)
+
+# Function to calculate probabilities
+def calculate_probabilities(data, count, current_close, bands=probkernel.default_bands):
+    return calculate_window_probabilities(data, [count], current_close, bands)[count]
+
+# Function to simulate Increase/Decrease/Range probabilities `horizons` bars
+# ahead for every candle count (one seeded stream per count)
+@metrics.instrument("calculate_window_horizon_probabilities")
+def calculate_window_horizon_probabilities(data, counts, current_close, horizons=montecarlo.default_horizons,
+                                           bands=probkernel.default_bands, model=montecarlo.default_model,
+                                           paths=montecarlo.default_paths, seed=None):
+    if data is None:
+        return {count: None for count in counts}
+    closes = data["Close"].to_numpy()
+    valid = [count for count in counts if len(closes) >= count]
+    results = montecarlo.simulate_many([(closes[len(closes) - count:], current_close) for count in valid], horizons,
+                                       bands, model, paths, seed, max_workers=1)
+    by_count = dict(zip(valid, results))
+    return {count: by_count.get(count) for count in counts}
+
+# Function to simulate probabilities `horizons` bars ahead
+def calculate_horizon_probabilities(data, count, current_close, horizons=montecarlo.default_horizons,
+                                    bands=probkernel.default_bands, model=montecarlo.default_model,
+                                    paths=montecarlo.default_paths, seed=None):
+    return calculate_window_horizon_probabilities(data, [count], current_close, horizons, bands, model, paths,
+                                                  seed)[count]
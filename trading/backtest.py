@@ -0,0 +1,137 @@
+import numpy as np
+from scipy.special import ndtr
+from . import metrics
+
+# Predictions evaluated per chunk; bounds memory on very long histories
+default_chunk_size = 1_000_000
+
+# Running sums for one (series, candle count) so chunks and symbols can be combined
+class Calibration:
+    def __init__(self, bins=10):
+        self.bins = bins
+        self.predictions = 0
+        self.hits = 0
+        self.brier = {"Increase": 0.0, "Decrease": 0.0, "Range": 0.0}
+        self.range_predicted = 0.0
+        self.range_observed = 0
+        self.bin_counts = np.zeros(bins, dtype=np.int64)
+        self.bin_predicted = np.zeros(bins)
+        self.bin_observed = np.zeros(bins)
+
+    def add(self, prob_increase, prob_decrease, prob_range, went_up, went_down, in_range):
+        self.predictions += len(prob_increase)
+        self.hits += int(np.count_nonzero((prob_increase > 0.5) == went_up))
+        self.brier["Increase"] += float(np.sum((prob_increase - went_up) ** 2))
+        self.brier["Decrease"] += float(np.sum((prob_decrease - went_down) ** 2))
+        self.brier["Range"] += float(np.sum((prob_range - in_range) ** 2))
+        self.range_predicted += float(prob_range.sum())
+        self.range_observed += int(np.count_nonzero(in_range))
+        # Reliability curve of the Increase forecast
+        bin_index = np.minimum((prob_increase * self.bins).astype(np.int64), self.bins - 1)
+        self.bin_counts += np.bincount(bin_index, minlength=self.bins)
+        self.bin_predicted += np.bincount(bin_index, weights=prob_increase, minlength=self.bins)
+        self.bin_observed += np.bincount(bin_index, weights=went_up, minlength=self.bins)
+
+    def merge(self, other):
+        self.predictions += other.predictions
+        self.hits += other.hits
+        for key in self.brier:
+            self.brier[key] += other.brier[key]
+        self.range_predicted += other.range_predicted
+        self.range_observed += other.range_observed
+        self.bin_counts += other.bin_counts
+        self.bin_predicted += other.bin_predicted
+        self.bin_observed += other.bin_observed
+        return self
+
+    # Summary in percent (Brier scores stay on the 0-1 probability scale)
+    def report(self):
+        n = self.predictions
+        if n == 0:
+            return None
+        reliability = []
+        for b in range(self.bins):
+            count = int(self.bin_counts[b])
+            if count:
+                reliability.append((b / self.bins * 100, (b + 1) / self.bins * 100,
+                                    self.bin_predicted[b] / count * 100, self.bin_observed[b] / count * 100, count))
+        return {
+            "Predictions": n,
+            "Hit_Rate": self.hits / n * 100,
+            "Brier_Increase": self.brier["Increase"] / n,
+            "Brier_Decrease": self.brier["Decrease"] / n,
+            "Brier_Range": self.brier["Range"] / n,
+            "Range_Predicted": self.range_predicted / n * 100,
+            "Range_Observed": self.range_observed / n * 100,
+            "Reliability": reliability
+        }
+
+# Function to evaluate calculate_probabilities at every bar of a close series.
+# At bar t the model sees the `count` closes ending at t (count - 1 diffs) and
+# is scored against the change to bar t + 1. Sliding-window sums come from
+# cumulative sums over each chunk, so nothing loops over bars in Python.
+@metrics.instrument("backtest_series")
+def backtest_series(closes, counts, band=1.5, bins=10, chunk_size=default_chunk_size):
+    closes = np.asarray(closes, dtype=np.float64)
+    changes = np.diff(closes)
+    results = {count: Calibration(bins) for count in counts}
+    for count in counts:
+        window = count - 1
+        if window < 2:
+            continue
+        calibration = results[count]
+        # Targets are change indices t with a full window of changes before them
+        for start in range(window, len(changes), chunk_size):
+            stop = min(start + chunk_size, len(changes))
+            block = changes[start - window:stop]
+            shift = block.mean()
+            centered = block - shift
+            sums = np.concatenate(([0.0], np.cumsum(centered)))
+            squares = np.concatenate(([0.0], np.cumsum(centered * centered)))
+            window_sum = sums[window:-1] - sums[:-window - 1]
+            window_squares = squares[window:-1] - squares[:-window - 1]
+            mean_change = window_sum / window + shift
+            variance = np.maximum(window_squares - window_sum ** 2 / window, 0) / (window - 1)
+            std_change = np.sqrt(variance)
+            outcome = block[window:]
+
+            valid = (std_change > 0) & np.isfinite(mean_change) & np.isfinite(outcome)
+            mean_change, std_change, outcome = mean_change[valid], std_change[valid], outcome[valid]
+            prob_decrease = ndtr(-mean_change / std_change)
+            prob_range = ndtr((band * std_change - mean_change) / std_change) - \
+                ndtr((-band * std_change - mean_change) / std_change)
+            calibration.add(1 - prob_decrease, prob_decrease, prob_range,
+                            (outcome > 0).astype(np.float64), (outcome < 0).astype(np.float64),
+                            (np.abs(outcome) < band * std_change).astype(np.float64))
+    return results
+
+# Function to backtest many series, e.g. {(symbol, timeframe): closes}.
+# Returns per-key reports plus per-timeframe reports pooled across symbols.
+def backtest(series, counts, band=1.5, bins=10, chunk_size=default_chunk_size):
+    per_key = {}
+    pooled = {}
+    for key, closes in series.items():
+        calibrations = backtest_series(closes, counts, band, bins, chunk_size)
+        per_key[key] = {count: calibration.report() for count, calibration in calibrations.items()}
+        timeframe = key[-1] if isinstance(key, tuple) else key
+        for count, calibration in calibrations.items():
+            pooled.setdefault(timeframe, {}).setdefault(count, Calibration(bins)).merge(calibration)
+    by_timeframe = {
+        timeframe: {count: calibration.report() for count, calibration in counts_map.items()}
+        for timeframe, counts_map in pooled.items()
+    }
+    return per_key, by_timeframe
+
+# Function to print one report as produced by Calibration.report()
+def print_report(count, report, indent="  "):
+    if report is None:
+        print(f"{indent}Candle Count: {count}: Insufficient data for backtest.")
+        return
+    print(f"{indent}Candle Count: {count} ({report['Predictions']} predictions)")
+    print(f"{indent}  Increase: hit rate={report['Hit_Rate']:.2f}%, Brier={report['Brier_Increase']:.4f}")
+    print(f"{indent}  Decrease: Brier={report['Brier_Decrease']:.4f}")
+    print(f"{indent}  Range: predicted={report['Range_Predicted']:.2f}%, observed={report['Range_Observed']:.2f}%, "
+          f"Brier={report['Brier_Range']:.4f}")
+    print(f"{indent}  Reliability (Increase):")
+    for low, high, predicted, observed, n in report["Reliability"]:
+        print(f"{indent}    {low:.0f}-{high:.0f}%: predicted={predicted:.2f}%, observed={observed:.2f}%, n={n}")
@@ -0,0 +1,128 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+# Defaults for the pricing model (annualized, continuous compounding)
+risk_free_rate = 0.045
+dividend_yield = 0.0
+seconds_per_year = 365.0 * 86400
+min_time = 1.0 / seconds_per_year * 60  # Floor of one minute so expiring contracts stay finite
+sqrt_2pi = np.sqrt(2 * np.pi)
+
+# Implied volatility search bracket and tolerances
+min_vol = 1e-4
+max_vol = 5.0
+price_tolerance = 1e-6
+max_iterations = 100
+
+def normal_pdf(x):
+    return np.exp(-0.5 * x * x) / sqrt_2pi
+
+# Function to convert expirations (epoch seconds or date strings) to years from `as_of`
+def year_fractions(expiration, as_of=None):
+    as_of = time.time() if as_of is None else as_of
+    expiration = np.asarray(expiration)
+    if not np.issubdtype(expiration.dtype, np.number):
+        expiration = pd.to_datetime(expiration).values.astype("datetime64[s]").astype(np.int64)
+    return np.maximum((expiration.astype(np.float64) - as_of) / seconds_per_year, min_time)
+
+def d1_d2(spot, strike, years, vol, rate, dividend):
+    sqrt_t = np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate - dividend + 0.5 * vol * vol) * years) / (vol * sqrt_t)
+    return d1, d1 - vol * sqrt_t
+
+# Function to price European options; is_call is a boolean array
+def price(spot, strike, years, vol, is_call, rate=risk_free_rate, dividend=dividend_yield):
+    d1, d2 = d1_d2(spot, strike, years, vol, rate, dividend)
+    spot_disc = spot * np.exp(-dividend * years)
+    strike_disc = strike * np.exp(-rate * years)
+    call = spot_disc * ndtr(d1) - strike_disc * ndtr(d2)
+    put = strike_disc * ndtr(-d2) - spot_disc * ndtr(-d1)
+    return np.where(is_call, call, put)
+
+# Function to compute Greeks in the provider's conventions: theta per calendar
+# day, vega and rho per 1 percentage point
+def greeks(spot, strike, years, vol, is_call, rate=risk_free_rate, dividend=dividend_yield):
+    d1, d2 = d1_d2(spot, strike, years, vol, rate, dividend)
+    sqrt_t = np.sqrt(years)
+    div_disc = np.exp(-dividend * years)
+    rate_disc = np.exp(-rate * years)
+    pdf_d1 = normal_pdf(d1)
+    sign = np.where(is_call, 1.0, -1.0)
+    delta = sign * div_disc * ndtr(sign * d1)
+    gamma = div_disc * pdf_d1 / (spot * vol * sqrt_t)
+    theta = (-spot * div_disc * pdf_d1 * vol / (2 * sqrt_t)
+             - sign * rate * strike * rate_disc * ndtr(sign * d2)
+             + sign * dividend * spot * div_disc * ndtr(sign * d1)) / 365.0
+    vega = spot * div_disc * pdf_d1 * sqrt_t / 100.0
+    rho = sign * strike * years * rate_disc * ndtr(sign * d2) / 100.0
+    return {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega, "rho": rho}
+
+# Function to solve implied volatility for every contract at once: Newton steps
+# guarded by a per-contract bisection bracket, iterating only on contracts
+# that have not converged. Prices outside the no-arbitrage bounds give NaN.
+def implied_volatility(option_price, spot, strike, years, is_call, rate=risk_free_rate, dividend=dividend_yield):
+    option_price, spot, strike, years, is_call = np.broadcast_arrays(
+        np.asarray(option_price, dtype=np.float64), np.asarray(spot, dtype=np.float64),
+        np.asarray(strike, dtype=np.float64), np.asarray(years, dtype=np.float64), np.asarray(is_call, dtype=bool))
+    spot_disc = spot * np.exp(-dividend * years)
+    strike_disc = strike * np.exp(-rate * years)
+    lower_bound = np.where(is_call, np.maximum(spot_disc - strike_disc, 0), np.maximum(strike_disc - spot_disc, 0))
+    upper_bound = np.where(is_call, spot_disc, strike_disc)
+
+    vol = np.full(option_price.shape, np.nan)
+    active = np.flatnonzero((option_price > lower_bound) & (option_price < upper_bound) & (strike > 0) & (spot > 0))
+    if active.size == 0:
+        return vol
+
+    target = option_price.ravel()[active]
+    s, k, t, call = spot.ravel()[active], strike.ravel()[active], years.ravel()[active], is_call.ravel()[active]
+    low = np.full(active.size, min_vol)
+    high = np.full(active.size, max_vol)
+    # Brenner-Subrahmanyam start, clipped into the bracket
+    sigma = np.clip(np.sqrt(2 * np.pi / t) * target / s, 0.05, 2.0)
+    solved = np.full(active.size, np.nan)
+    pending = np.arange(active.size)
+
+    with np.errstate(all="ignore"):
+        for _ in range(max_iterations):
+            if pending.size == 0:
+                break
+            sig = sigma[pending]
+            d1, _ = d1_d2(s[pending], k[pending], t[pending], sig, rate, dividend)
+            diff = price(s[pending], k[pending], t[pending], sig, call[pending], rate, dividend) - target[pending]
+            converged = np.abs(diff) < price_tolerance
+            solved[pending[converged]] = sig[converged]
+
+            # Tighten the bracket: price increases with volatility
+            too_high = diff > 0
+            high[pending] = np.where(too_high, sig, high[pending])
+            low[pending] = np.where(too_high, low[pending], sig)
+
+            vega = s[pending] * np.exp(-dividend * t[pending]) * normal_pdf(d1) * np.sqrt(t[pending])
+            newton = sig - diff / vega
+            midpoint = 0.5 * (low[pending] + high[pending])
+            inside = np.isfinite(newton) & (newton > low[pending]) & (newton < high[pending])
+            sigma[pending] = np.where(inside, newton, midpoint)
+
+            stalled = (high[pending] - low[pending]) < 1e-10
+            solved[pending[stalled & ~converged]] = midpoint[stalled & ~converged]
+            pending = pending[~(converged | stalled)]
+
+    vol.ravel()[active] = solved
+    return vol
+
+# Function to compute implied volatility and Greeks for a whole chain from
+# strike, expiration, side and mid. Returns a DataFrame aligned to `chain`.
+def chain_greeks(chain, underlying_price, as_of=None, rate=risk_free_rate, dividend=dividend_yield):
+    strike = pd.to_numeric(chain["strike"], errors="coerce").to_numpy(dtype=np.float64)
+    mid = pd.to_numeric(chain["mid"], errors="coerce").to_numpy(dtype=np.float64)
+    is_call = chain["side"].astype(str).str.lower().to_numpy() == "call"
+    spot = np.broadcast_to(np.asarray(underlying_price, dtype=np.float64), strike.shape)
+    years = year_fractions(chain["expiration"].to_numpy(), as_of)
+    iv = implied_volatility(mid, spot, strike, years, is_call, rate, dividend)
+    with np.errstate(all="ignore"):
+        result = greeks(spot, strike, years, iv, is_call, rate, dividend)
+    result["iv"] = iv
+    return pd.DataFrame(result, index=chain.index)
@@ -0,0 +1,124 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Root directory for stored candles (one file per source/symbol/interval)
+store_dir = os.environ.get("CANDLE_STORE_DIR", "candle_store")
+
+# Fixed-width record layout so files can be appended to and memory-mapped
+candle_dtype = np.dtype([
+    ("time", "<i8"),  # Bar open time, epoch seconds (UTC)
+    ("Open", "<f8"),
+    ("High", "<f8"),
+    ("Low", "<f8"),
+    ("Close", "<f8"),
+    ("Volume", "<f8")
+])
+price_columns = ["Open", "High", "Low", "Close", "Volume"]
+
+# Function to build the path of a store file
+def store_path(source, symbol, interval):
+    safe_symbol = str(symbol).replace("/", "_").replace("^", "_")
+    return os.path.join(store_dir, source, f"{safe_symbol}_{interval}.bin")
+
+# Function to build the path of the file recording the earliest bar a source serves for a series
+def earliest_path(source, symbol, interval):
+    return os.path.splitext(store_path(source, symbol, interval))[0] + ".earliest"
+
+# Function to read the open time of the earliest bar the source serves (None if not known yet)
+def read_earliest(source, symbol, interval):
+    try:
+        with open(earliest_path(source, symbol, interval)) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+# Function to record the open time of the earliest bar the source serves
+def write_earliest(source, symbol, interval, timestamp):
+    path = earliest_path(source, symbol, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(str(int(timestamp)))
+
+# Function to open the stored records as a read-only memory map
+def read_records(source, symbol, interval):
+    path = store_path(source, symbol, interval)
+    if not os.path.exists(path) or os.path.getsize(path) < candle_dtype.itemsize:
+        return None
+    return np.memmap(path, dtype=candle_dtype, mode="r")
+
+# Function to get the open time (epoch seconds) of the last stored bar
+def last_timestamp(source, symbol, interval):
+    records = read_records(source, symbol, interval)
+    if records is None:
+        return None
+    return int(records["time"][-1])
+
+# Function to load stored candles as a DataFrame indexed by bar time
+def load_candles(source, symbol, interval, tz=None):
+    records = read_records(source, symbol, interval)
+    if records is None:
+        return None
+    return records_frame(records, tz)
+
+# Function to build a candle DataFrame from store records
+def records_frame(records, tz=None):
+    index = pd.to_datetime(records["time"], unit="s")
+    if tz is not None:
+        index = index.tz_localize("UTC").tz_convert(tz)
+    return pd.DataFrame({col: np.asarray(records[col]) for col in price_columns}, index=index)
+
+# Function to convert a candle DataFrame into store records
+def frame_to_records(df):
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    records = np.empty(len(df), dtype=candle_dtype)
+    records["time"] = index.values.astype("datetime64[s]").astype("i8")
+    for col in price_columns:
+        records[col] = df[col].to_numpy(dtype="f8") if col in df.columns else np.nan
+    return records
+
+# Function to append new candles, replacing any stored bars they overlap
+def append_candles(source, symbol, interval, df):
+    if df is None or df.empty:
+        return 0
+    return append_records(source, symbol, interval, frame_to_records(df))
+
+# Function to append store records (candle_dtype, any order), replacing any stored bars they overlap
+def append_records(source, symbol, interval, new):
+    if len(new) == 0:
+        return 0
+    new = new[np.argsort(new["time"], kind="stable")]
+    # Keep the last copy of duplicated timestamps (latest values win)
+    keep = np.append(new["time"][1:] != new["time"][:-1], True)
+    new = new[keep]
+
+    path = store_path(source, symbol, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    records = read_records(source, symbol, interval)
+    if records is None:
+        with open(path, "wb") as f:
+            f.write(new.tobytes())
+        return len(new)
+
+    first = int(np.searchsorted(records["time"], new["time"][0], side="left"))
+    last = int(np.searchsorted(records["time"], new["time"][-1], side="right"))
+    if last == len(records):
+        # Tail update: the provider re-sends the still-forming last bar, so
+        # overwrite from the first incoming timestamp instead of duplicating it
+        del records
+        with open(path, "r+b") as f:
+            f.truncate(first * candle_dtype.itemsize)
+        with open(path, "ab") as f:
+            f.write(new.tobytes())
+        return len(new)
+
+    # Older bars (e.g. a backfill): merge and rewrite the file
+    merged = np.concatenate([records[:first], new, records[last:]])
+    del records
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(merged.tobytes())
+    os.replace(tmp_path, path)
+    return len(new)
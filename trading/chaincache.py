@@ -0,0 +1,45 @@
+import os
+from datetime import datetime
+import pandas as pd
+
+# Root directory for cached option chain snapshots (one file per ticker/date)
+cache_dir = os.environ.get("CHAIN_CACHE_DIR", "chain_cache")
+
+# Function to build the path of a cached snapshot
+def snapshot_path(ticker, date, suffix=".pkl"):
+    return os.path.join(cache_dir, ticker, f"{date}{suffix}")
+
+# Only completed trading dates are immutable; today's chain is still changing
+def is_cacheable(date):
+    return date is not None and date < datetime.now().strftime("%Y-%m-%d")
+
+# Function to check whether a date was already fetched (with or without data)
+def is_cached(ticker, date):
+    if not is_cacheable(date):
+        return False
+    return os.path.exists(snapshot_path(ticker, date)) or os.path.exists(snapshot_path(ticker, date, ".empty"))
+
+# Function to load a cached snapshot (None for dates known to have no data)
+def load_chain(ticker, date):
+    path = snapshot_path(ticker, date)
+    if not os.path.exists(path):
+        return None
+    return pd.read_pickle(path)
+
+# Function to store a fetched snapshot
+def save_chain(ticker, date, df):
+    if not is_cacheable(date):
+        return
+    path = snapshot_path(ticker, date)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+# Function to remember that a date has no chain (holidays, dates before listing)
+def mark_empty(ticker, date):
+    if not is_cacheable(date):
+        return
+    path = snapshot_path(ticker, date, ".empty")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
@@ -0,0 +1,123 @@
+import argparse
+import importlib
+from . import metrics
+
+# Only the standard library (and the stdlib-only metrics module) is imported
+# here; each subcommand imports its module (and numpy/pandas/yfinance/requests)
+# after the arguments are parsed, so --help and argument errors return immediately.
+
+# Function to parse --shrinkage: "auto" or an intensity in [0, 1]
+def shrinkage_value(value):
+    if value == "auto":
+        return value
+    try:
+        intensity = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected auto or a number in [0, 1], got {value!r}")
+    if not 0 <= intensity <= 1:
+        raise argparse.ArgumentTypeError(f"intensity must be in [0, 1], got {value}")
+    return intensity
+
+def add_common_arguments(parser):
+    parser.add_argument("--bands", type=float, nargs="+", default=[1.5],
+                        help="range band(s) in standard deviations (default: 1.5)")
+    parser.add_argument("--cache-only", action="store_true",
+                        help="use only locally stored data; never touch the network")
+    parser.add_argument("--metrics-log", metavar="PATH",
+                        help="append JSON event lines (fetches, final metrics snapshot) to PATH; - for stderr")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="write a Prometheus text snapshot of the metrics to PATH on exit; - for stdout")
+
+def add_candle_arguments(parser):
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50, 200],
+                        help="candle counts (window sizes) to analyze (default: 10 50 200)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--live", action="store_true", help="keep polling and refresh results as bars close")
+    mode.add_argument("--replay", type=float, nargs="?", const=0.0, metavar="SPEED",
+                      help="live mode replaying stored candles at SPEED x real time (default: as fast as possible)")
+    mode.add_argument("--backtest", action="store_true", help="score the probabilities at every stored bar")
+    parser.add_argument("--horizons", type=int, nargs="+", metavar="BARS",
+                        help="also simulate Monte Carlo probabilities this many bars ahead")
+    parser.add_argument("--mc-model", default="bootstrap", choices=["bootstrap", "student_t"],
+                        help="Monte Carlo return model: resampled window returns or a fitted Student-t (default: bootstrap)")
+    parser.add_argument("--paths", type=int, default=10000, help="Monte Carlo paths per scenario (default: 10000)")
+    return mode
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="trading", description="Stock, crypto and options analysis.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    stock = subparsers.add_parser("stock", help="intraday stock analysis (yfinance)")
+    stock.add_argument("--symbol", default="SPY", help="stock ticker (default: SPY)")
+    mode = add_candle_arguments(stock)
+    mode.add_argument("--scan", nargs="+", metavar="TICKER", help="rank a universe of tickers instead")
+    stock.add_argument("--rank-by", default="Increase", help="scanner ranking column (default: Increase)")
+    stock.add_argument("--top", type=int, default=20, help="scanner rows per timeframe and count (default: 20)")
+    add_common_arguments(stock)
+
+    crypto = subparsers.add_parser("crypto", help="cryptocurrency analysis (CryptoCompare)")
+    crypto.add_argument("--pair", nargs="+", default=["BTC-USD"], help="pair(s) to analyze (default: BTC-USD)")
+    crypto.add_argument("--all-pairs", action="store_true", help="analyze every supported pair")
+    crypto.add_argument("--currency", default="USD", help="quote currency (default: USD)")
+    crypto.add_argument("--api-key", help="CryptoCompare API key (default: $CRYPTOCOMPARE_API_KEY)")
+    mode = add_candle_arguments(crypto)
+    mode.add_argument("--backfill", type=float, metavar="DAYS",
+                      help="page back DAYS of history into the candle store (free keys get 7 days of 1m bars)")
+    crypto.add_argument("--backfill-timeframes", nargs="+", default=["1m", "1h", "1d"],
+                        choices=["1m", "1h", "1d"],
+                        help="base series to backfill; other timeframes are aggregated from them (default: 1m 1h 1d)")
+    add_common_arguments(crypto)
+
+    options = subparsers.add_parser("options", help="options chain analysis (marketdata.app)")
+    options.add_argument("--ticker", default="SPY", help="SPY or QQQ (default: SPY)")
+    options.add_argument("--api-key", help="marketdata.app token (default: $MARKETDATA_API_KEY)")
+    options.add_argument("--periods", type=int, nargs="+", default=[10, 50, 200],
+                         help="analysis periods in trading days (default: 10 50 200)")
+    add_common_arguments(options)
+
+    cross = subparsers.add_parser("cross", help="cross-asset correlations and joint move probabilities (stored candles)")
+    cross.add_argument("--assets", nargs="+", required=True, metavar="ASSET",
+                       help="stock:SYMBOL or crypto:PAIR (bare names with a dash are crypto pairs)")
+    cross.add_argument("--timeframe", default="1m", choices=["1m", "5m", "30m", "1h", "4h", "1d", "1w"],
+                       help="bar timeframe (default: 1m)")
+    cross.add_argument("--days", type=float, help="only use the last DAYS of history (default: all stored)")
+    cross.add_argument("--shrinkage", type=shrinkage_value, help="correlation shrinkage: auto or an intensity in [0, 1] (default: none)")
+    cross.add_argument("--pair", nargs=2, action="append", metavar=("FIRST", "SECOND"),
+                       help="print the joint probabilities of a pair (repeatable)")
+    cross.add_argument("--top", type=int, default=20, help="most correlated pairs to list (default: 20)")
+    cross.add_argument("--save", metavar="PATH", help="save the matrices to a .npz file")
+    cross.add_argument("--metrics-log", metavar="PATH", help="append JSON event lines to PATH; - for stderr")
+    cross.add_argument("--metrics-file", metavar="PATH", help="write a Prometheus text snapshot to PATH on exit")
+
+    serve = subparsers.add_parser("serve", help="keep data resident and answer queries over a local HTTP/JSON API")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    serve.add_argument("--symbols", nargs="+", metavar="SYMBOL",
+                       help="stocks/crypto pairs to load at startup (others load on first request)")
+    serve.add_argument("--options", nargs="+", metavar="TICKER", help="option chains to load at startup")
+    serve.add_argument("--refresh", type=float, metavar="SECONDS",
+                       help="seconds between background refreshes (default: $TRADING_SERVER_REFRESH or 30)")
+    serve.add_argument("--api-key", help="marketdata.app token for option chains (default: $MARKETDATA_API_KEY)")
+    add_common_arguments(serve)
+    return parser
+
+# Subcommand -> module implementing run(args)
+commands = {
+    "stock": "trading.stock",
+    "crypto": "trading.crypto",
+    "options": "trading.options",
+    "cross": "trading.crossasset",
+    "serve": "trading.server"
+}
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics_log:
+        metrics.configure_log(args.metrics_log)
+    try:
+        module = importlib.import_module(commands[args.command])
+        return module.run(args)
+    finally:
+        metrics.log_event("snapshot", **metrics.snapshot())
+        if args.metrics_file:
+            metrics.write_prometheus(args.metrics_file)
@@ -0,0 +1,297 @@
+import numpy as np
+from scipy.special import ndtr
+from . import candlestore
+from . import metrics
+from . import resample
+
+# Cross-asset return statistics over aligned bars. Log returns are placed on
+# a regular epoch grid (one slot per bar of the timeframe) and streamed from
+# the candle store in time chunks; pairwise sums are accumulated per block of
+# symbols with matrix products, so memory is O(symbols^2) plus one chunk no
+# matter how long the history is. Each pair uses the bars both symbols have
+# (pairwise-complete), so stocks and 24/7 crypto pair up on market hours.
+
+# Seconds per bar of the supported timeframes
+timeframe_seconds = {
+    "1m": 60,
+    "5m": 300,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+    "1w": 604800
+}
+chunk_rows = 16384  # Grid slots per streamed time chunk
+block_size = 128  # Symbols per block in the pairwise products
+min_observations = 30  # Pairs with fewer common returns are reported as NaN
+
+# Gauss-Legendre nodes on [0, 1] for the bivariate normal integral
+gl_nodes, gl_weights = np.polynomial.legendre.leggauss(20)
+gl_nodes = (gl_nodes + 1) / 2
+gl_weights = gl_weights / 2
+
+# Function to compute P(X < a, Y < b) for standard bivariate normals with
+# correlation rho (arrays broadcast), by integrating Plackett's identity
+# dPhi2/drho = phi2 from 0 to rho with Gauss-Legendre quadrature
+def bivariate_normal_cdf(a, b, rho):
+    a, b, rho = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64),
+                                    np.clip(np.asarray(rho, dtype=np.float64), -0.999999, 0.999999))
+    theta = np.arcsin(rho)[..., None] * gl_nodes
+    sin_t, cos_t = np.sin(theta), np.cos(theta)
+    exponent = -(a[..., None] ** 2 + b[..., None] ** 2 - 2 * a[..., None] * b[..., None] * sin_t) / (2 * cos_t ** 2)
+    integral = np.arcsin(rho) * (np.exp(exponent) * gl_weights).sum(axis=-1) / (2 * np.pi)
+    return ndtr(a) * ndtr(b) + integral
+
+# Function to place one symbol's log returns for grid slots [t0, t0 + rows*seconds)
+# into column `column` of X (and 1 into the mask M). A return needs the bar one
+# slot earlier, so the slice starts a bar before the chunk.
+def fill_returns(records, t0, seconds, rows, X, M, column):
+    times = records["time"]
+    lo = int(np.searchsorted(times, t0 - seconds, side="left"))
+    hi = int(np.searchsorted(times, t0 + rows * seconds, side="left"))
+    if hi - lo < 2:
+        return
+    part_times = np.asarray(times[lo:hi])
+    closes = np.asarray(records["Close"][lo:hi], dtype=np.float64)
+    valid = (np.diff(part_times) == seconds) & (closes[1:] > 0) & (closes[:-1] > 0) & (part_times[1:] >= t0)
+    if not valid.any():
+        return
+    slots = (part_times[1:][valid] - t0) // seconds
+    with np.errstate(divide="ignore", invalid="ignore"):
+        X[slots, column] = np.log(closes[1:][valid] / closes[:-1][valid])
+    M[slots, column] = 1.0
+
+# Pairwise sums accumulated over chunks. With X the returns (0 where missing),
+# M the observed mask and U/D the up/down-move masks (flat bars are neither),
+# entry [i, j] of each sum covers the bars where both i and j have a return.
+class PairwiseSums:
+    def __init__(self, count):
+        shape = (count, count)
+        self.n = np.zeros(shape)  # M'M: common observations
+        self.sx = np.zeros(shape)  # X'M: sum of i's returns
+        self.sxx = np.zeros(shape)  # (X^2)'M: sum of i's squared returns
+        self.sxy = np.zeros(shape)  # X'X: sum of cross products
+        self.q = np.zeros(shape)  # (X^2)'(X^2): for the shrinkage intensity
+        self.up = np.zeros(shape)  # U'U: both up
+        self.down = np.zeros(shape)  # D'D: both down
+
+    # Function to add one chunk, block by block (upper block triangle only).
+    # The 0/1 counts are exact in float32 within a chunk, so they use the
+    # faster single-precision products; sums of returns stay float64.
+    def add(self, X, M):
+        X2 = X * X
+        U = (X > 0).astype(np.float32)
+        D = (X < 0).astype(np.float32)
+        M64 = M.astype(np.float64)
+        count = X.shape[1]
+        blocks = [slice(start, min(start + block_size, count)) for start in range(0, count, block_size)]
+        for bi, I in enumerate(blocks):
+            for J in blocks[bi:]:
+                self.n[I, J] += M[:, I].T @ M[:, J]
+                self.sxy[I, J] += X[:, I].T @ X[:, J]
+                self.q[I, J] += X2[:, I].T @ X2[:, J]
+                self.up[I, J] += U[:, I].T @ U[:, J]
+                self.down[I, J] += D[:, I].T @ D[:, J]
+                self.sx[I, J] += X[:, I].T @ M64[:, J]
+                self.sxx[I, J] += X2[:, I].T @ M64[:, J]
+                if I != J:
+                    self.sx[J, I] += X[:, J].T @ M64[:, I]
+                    self.sxx[J, I] += X2[:, J].T @ M64[:, I]
+
+    # Function to mirror the symmetric sums computed on the upper block triangle
+    def symmetrize(self):
+        for matrix in (self.n, self.sxy, self.q, self.up, self.down):
+            upper = np.triu(matrix)
+            matrix[...] = upper + np.triu(matrix, 1).T
+
+# Function to stream aligned returns of every series and accumulate the pairwise
+# sums. `series` maps a name to time-sorted candle records (candlestore dtype,
+# e.g. a memory map from candlestore.read_records); start/end bound the grid.
+def accumulate(series, seconds, start=None, end=None):
+    names = list(series)
+    records = [series[name] for name in names]
+    firsts = [int(r["time"][0]) for r in records if len(r)]
+    lasts = [int(r["time"][-1]) for r in records if len(r)]
+    sums = PairwiseSums(len(names))
+    if not firsts:
+        return names, sums
+    t_start = max(min(firsts), start if start is not None else min(firsts)) // seconds * seconds
+    t_end = min(max(lasts), end if end is not None else max(lasts))
+
+    X = np.empty((chunk_rows, len(names)))
+    M = np.empty((chunk_rows, len(names)), dtype=np.float32)
+    for t0 in range(t_start, t_end + 1, chunk_rows * seconds):
+        rows = min(chunk_rows, (t_end - t0) // seconds + 1)
+        X[:rows] = 0.0
+        M[:rows] = 0.0
+        for column, r in enumerate(records):
+            fill_returns(r, t0, seconds, rows, X, M, column)
+        observed = M[:rows].any(axis=1)  # Skip slots no symbol traded in (e.g. stock-only nights)
+        if observed.any():
+            sums.add(X[:rows][observed], M[:rows][observed])
+    sums.symmetrize()
+    return names, sums
+
+# Function to estimate a shrinkage intensity towards zero correlation
+# (Schafer-Strimmer): the summed estimation variance of the off-diagonal
+# correlations over their summed squares, clipped to [0, 1]
+def shrinkage_intensity(corr, n, q, var_x, var_y):
+    off = ~np.eye(len(corr), dtype=bool) & np.isfinite(corr)
+    if not off.any():
+        return 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (q / n / (var_x * var_y) - corr ** 2) / n
+    denominator = np.sum(corr[off] ** 2)
+    if denominator <= 0:
+        return 0.0
+    return float(np.clip(np.nansum(variance[off]) / denominator, 0.0, 1.0))
+
+# Function to compute covariance/correlation matrices and joint move
+# probabilities for every pair. `shrinkage` is None, a fixed intensity in
+# [0, 1] or "auto"; correlations are shrunk towards zero by that amount.
+# Probabilities are in percent: the Gaussian model uses each symbol's own
+# mean/std and the pair's correlation; the empirical ones count common bars.
+@metrics.instrument("cross_asset_stats")
+def cross_asset_stats(series, seconds, start=None, end=None, shrinkage=None):
+    names, sums = accumulate(series, seconds, start, end)
+    n = np.where(sums.n >= min_observations, sums.n, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = sums.sx / n
+        var_x = (sums.sxx - sums.sx ** 2 / n) / (n - 1)  # i's variance over the pair's common bars
+        var_y = var_x.T
+        cov = (sums.sxy - sums.sx * sums.sx.T / n) / (n - 1)
+        corr = cov / np.sqrt(var_x * var_y)
+    mean = np.diag(mean_x).copy()
+    std = np.sqrt(np.diag(var_x))
+
+    intensity = shrinkage_intensity(corr, n, sums.q, var_x, var_y) if shrinkage == "auto" else float(shrinkage or 0.0)
+    corr = corr * (1 - intensity)
+    np.fill_diagonal(corr, np.where(np.isfinite(std), 1.0, np.nan))
+    cov = corr * np.outer(std, std)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = mean / np.where(std > 0, std, np.nan)
+        both_up = bivariate_normal_cdf(z[:, None], z[None, :], corr)
+        both_down = bivariate_normal_cdf(-z[:, None], -z[None, :], corr)
+        empirical_up = sums.up / n
+        empirical_down = sums.down / n
+
+    return {
+        "Names": names,
+        "Observations": sums.n,
+        "Mean": mean,
+        "Std": std,
+        "Covariance": cov,
+        "Correlation": corr,
+        "Shrinkage": intensity,
+        "Increase": ndtr(z) * 100,
+        "Both_Increase": both_up * 100,
+        "Both_Decrease": both_down * 100,
+        "Empirical_Both_Increase": empirical_up * 100,
+        "Empirical_Both_Decrease": empirical_down * 100
+    }
+
+# Function to pick one pair out of cross_asset_stats as a dict, in the style of
+# calculate_probabilities (None if the pair has too few common bars)
+def pair_probabilities(stats, first, second):
+    i, j = stats["Names"].index(first), stats["Names"].index(second)
+    if not np.isfinite(stats["Correlation"][i, j]):
+        return None
+    increase_i, increase_j = float(stats["Increase"][i]), float(stats["Increase"][j])
+    both_up = float(stats["Both_Increase"][i, j])
+    return {
+        "Pair": (first, second),
+        "Observations": int(stats["Observations"][i, j]),
+        "Correlation": float(stats["Correlation"][i, j]),
+        "Covariance": float(stats["Covariance"][i, j]),
+        "Increase": (increase_i, increase_j),
+        "Decrease": (100 - increase_i, 100 - increase_j),
+        "Both_Increase": both_up,
+        "Both_Decrease": float(stats["Both_Decrease"][i, j]),
+        "First_Only_Increase": increase_i - both_up,
+        "Second_Only_Increase": increase_j - both_up,
+        "Empirical_Both_Increase": float(stats["Empirical_Both_Increase"][i, j]),
+        "Empirical_Both_Decrease": float(stats["Empirical_Both_Decrease"][i, j])
+    }
+
+# Function to find the stored candle records of a symbol ("stock:SPY",
+# "crypto:BTC-USD"; bare names with a dash are crypto pairs) for a timeframe:
+# a memory map of the stored series, or an aggregate of a finer base when that
+# spans more bars. None if nothing is stored.
+def load_records(spec, timeframe):
+    kind, _, symbol = spec.partition(":") if ":" in spec else ("crypto" if "-" in spec else "stock", "", spec)
+    seconds = timeframe_seconds[timeframe]
+    stored = []  # (records, base seconds)
+    if kind == "crypto":
+        from . import crypto
+        coin, _, vs_currency = symbol.partition("-")
+        coin = crypto.ticker_map.get(symbol, coin)
+        for base_seconds in crypto.base_candidates(seconds):
+            endpoint, aggregate = crypto.select_endpoint(base_seconds)
+            stored.append((candlestore.read_records("cryptocompare", f"{coin}-{vs_currency}", f"{endpoint}{aggregate}"),
+                           base_seconds))
+    else:
+        stored.append((candlestore.read_records("yfinance", symbol, timeframe), seconds))
+        if seconds % 60 == 0 and seconds > 60:
+            stored.append((candlestore.read_records("yfinance", symbol, "1m"), 60))
+    stored = [(records, base_seconds) for records, base_seconds in stored if records is not None and len(records)]
+    if not stored:
+        return None
+
+    # Like crypto.derive_timeframe: skip bases ending more than a bar behind the
+    # freshest one, then take the base spanning the most bars (native on ties)
+    latest_end = max(int(records["time"][-1]) + base_seconds for records, base_seconds in stored)
+    fresh = [(records, base_seconds) for records, base_seconds in stored
+             if int(records["time"][-1]) + base_seconds >= latest_end - seconds]
+    records, base_seconds = max(fresh, key=lambda item: ((int(item[0]["time"][-1]) - int(item[0]["time"][0])) // seconds,
+                                                         item[1] == seconds))
+    return records if base_seconds == seconds else resample.aggregate(records, seconds)
+
+# Function to run the `cross` subcommand (reads the candle store only)
+def run(args):
+    seconds = timeframe_seconds[args.timeframe]
+    series = {}
+    for spec in args.assets:
+        records = load_records(spec, args.timeframe)
+        if records is None or len(records) < 2:
+            print(f"No stored {args.timeframe} candles for {spec}; fetch them with the stock/crypto commands first.")
+            continue
+        series[spec.partition(":")[2] or spec] = records
+    if len(series) < 2:
+        print("Need stored candles for at least two assets.")
+        return
+
+    end = max(int(r["time"][-1]) for r in series.values())
+    start = end - int(args.days * 86400) if args.days else None
+    stats = cross_asset_stats(series, seconds, start, end, args.shrinkage)
+    names = stats["Names"]
+    print(f"Cross-Asset Analysis ({args.timeframe}, {len(names)} assets, shrinkage {stats['Shrinkage']:.3f})\n")
+
+    upper = np.triu_indices(len(names), 1)
+    corr = stats["Correlation"][upper]
+    order = np.argsort(-np.abs(np.nan_to_num(corr)))[:args.top]
+    print("Most Correlated Pairs:")
+    for k in order:
+        i, j = upper[0][k], upper[1][k]
+        if np.isfinite(corr[k]):
+            print(f"  {names[i]} / {names[j]}: Correlation={corr[k]:.3f}, Both Increase={stats['Both_Increase'][i, j]:.2f}%, "
+                  f"Both Decrease={stats['Both_Decrease'][i, j]:.2f}% ({int(stats['Observations'][i, j])} bars)")
+
+    for first, second in args.pair or []:
+        print(f"\nPair: {first} / {second}")
+        probs = pair_probabilities(stats, first, second) if first in names and second in names else None
+        if probs is None:
+            print("  Insufficient common data.")
+            continue
+        print(f"  Correlation: {probs['Correlation']:.3f} over {probs['Observations']} bars")
+        print(f"  Increase: {probs['Increase'][0]:.2f}% / {probs['Increase'][1]:.2f}%")
+        print(f"  Both Increase: {probs['Both_Increase']:.2f}% (observed {probs['Empirical_Both_Increase']:.2f}%)")
+        print(f"  Both Decrease: {probs['Both_Decrease']:.2f}% (observed {probs['Empirical_Both_Decrease']:.2f}%)")
+        print(f"  Only {first} Increases: {probs['First_Only_Increase']:.2f}%")
+        print(f"  Only {second} Increases: {probs['Second_Only_Increase']:.2f}%")
+
+    if args.save:
+        np.savez(args.save, names=np.array(names), correlation=stats["Correlation"], covariance=stats["Covariance"],
+                 observations=stats["Observations"], both_increase=stats["Both_Increase"],
+                 both_decrease=stats["Both_Decrease"])
+        print(f"\nMatrices saved to {args.save}")
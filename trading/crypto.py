@@ -0,0 +1,396 @@
+import os
+import math
+import time
+import numpy as np
+from . import backtest
+from . import candlestore
+from . import ingest
+from . import livefeed
+from . import metrics
+from . import resample
+from .analysis import calculate_window_horizon_probabilities, calculate_window_probabilities, calculate_window_stats
+
+api_key = os.environ.get("CRYPTOCOMPARE_API_KEY",
+                         "aa7062059e695152e5c69ecb8ec99e51fef3a5f5cbe1f72300dfb39d50eb7e6c")  # Get free key at https://min-api.cryptocompare.com/
+# Overridable so benchmarks can point at a local stand-in server
+base_url = os.environ.get("CRYPTOCOMPARE_BASE_URL", "https://min-api.cryptocompare.com")
+
+# Map tickers to CryptoCompare symbols
+ticker_map = {
+    "BTC-USD": "BTC",
+    "ETH-USD": "ETH",
+    "SOL-USD": "SOL",
+    "DOGE-USD": "DOGE",
+    "TRON-USD": "TRX",
+    "BNB-USD": "BNB"
+}
+
+# Timeframes (seconds per candle)
+timeframes = {
+    "1m": 60,
+    "5m": 300,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+    "1w": 604800
+}
+
+# Bars per history request (the API maximum); backfill pages are this long
+page_limit = 2000
+backfill_rounds = 3  # Passes over failed backfill pages (each request already retries in the engine)
+gap_tolerance = 1.01  # Stored history may span this much longer than its bar count (provider gaps)
+history_limits = {"histominute": 7 * 86400}  # Seconds of history the API serves per endpoint (others go back to listing)
+
+# Shared pooled session and rate limiter; (pair, timeframe) requests run concurrently.
+# Created on first use so cache-only runs never import requests.
+engine = None
+
+def get_engine():
+    global engine
+    if engine is None:
+        from . import fetchengine
+        engine = fetchengine.FetchEngine(fetchengine.provider_limits["cryptocompare"], max_workers=8)
+    return engine
+
+# Function to select the endpoint and aggregation for a timeframe
+def select_endpoint(timeframe_seconds):
+    if timeframe_seconds <= 1800:  # 1m, 5m, 30m
+        return "histominute", timeframe_seconds // 60  # Minutes
+    elif timeframe_seconds <= 14400:  # 1h, 4h
+        return "histohour", timeframe_seconds // 3600  # Hours
+    else:  # 1d, 1w
+        return "histoday", 1 if timeframe_seconds == 86400 else 7  # Days or weeks (resampled)
+
+# Function to build the candle DataFrame on decoded candle columns (index in UTC, matching the candle store)
+def candles_frame(columns):
+    return ingest.columns_frame(columns, candlestore.price_columns, index=ingest.epoch_index(columns["time"]))
+
+# Function to fetch the bars after the last stored one for an endpoint's series
+# (the last max_candles at most) into the candle store; returns the bars received
+def fetch_latest(coin, vs_currency, timeframe_seconds, max_candles):
+    try:
+        endpoint, aggregate = select_endpoint(timeframe_seconds)
+
+        # Read the local store first and only request bars newer than the last stored one
+        store_symbol = f"{coin}-{vs_currency}"
+        store_interval = f"{endpoint}{aggregate}"
+        limit = min(max_candles, page_limit)
+        last_ts = candlestore.last_timestamp("cryptocompare", store_symbol, store_interval)
+        if last_ts is not None:
+            bars_missing = (int(time.time()) - last_ts) // timeframe_seconds + 1
+            limit = max(1, min(limit, bars_missing))
+
+        url = f"{base_url}/data/v2/{endpoint}"
+        params = {
+            "fsym": coin,
+            "tsym": vs_currency,
+            "limit": limit,
+            "aggregate": aggregate,
+            "api_key": api_key
+        }
+
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124",
+            "Accept": "application/json"
+        }
+
+        print(f"Fetching URL: {url} with params: {params}")
+        response = get_engine().get(url, params=params, headers=headers, label=f"{coin} {timeframe_seconds}s")
+        if response is None:
+            return 0
+        print(f"Status Code: {response.status_code}")
+        if response.status_code == 401:
+            print(f"401 Unauthorized for {timeframe_seconds}s. Check API key at https://min-api.cryptocompare.com/.")
+            return 0
+        response.raise_for_status()
+
+        try:
+            with metrics.timer("decode_seconds", source="cryptocompare"):
+                candles = ingest.cryptocompare_candles(response.content)
+        except (ValueError, KeyError, TypeError):
+            print(f"Invalid JSON response for {timeframe_seconds}s timeframe.")
+            return 0
+
+        if candles is None or (len(candles["time"]) < 2 and last_ts is None):
+            print(f"No valid data returned for {timeframe_seconds}s timeframe.")
+            return 0
+
+        with metrics.timer("frame_seconds", source="cryptocompare"):
+            df = candles_frame(candles)
+        metrics.inc("rows_processed_total", len(df), stage="cryptocompare.frame")
+        return candlestore.append_candles("cryptocompare", store_symbol, store_interval, df)
+    except Exception as e:
+        print(f"Error fetching data for {timeframe_seconds}s: {e}")
+        return 0
+
+# Function to backfill `days` of history by paging backwards with toTs. Pages
+# are independent, so they are fetched concurrently within the rate limit and
+# each is written straight into its own slot of one preallocated record
+# buffer; overlapping bars are deduplicated when the buffer is stored. Failed
+# pages are fetched again, and reported if they still fail. When every page
+# came back and the oldest bar is newer than the span asked for, the API has
+# nothing earlier; that bar is recorded so fetch_base stops backfilling the
+# series. Returns the number of bars written to the candle store.
+def backfill(coin, vs_currency, timeframe_seconds, days):
+    endpoint, aggregate = select_endpoint(timeframe_seconds)
+    pages = math.ceil(days * 86400 / timeframe_seconds / page_limit)
+    end = int(time.time()) // timeframe_seconds * timeframe_seconds
+    start = end - (pages * page_limit - 1) * timeframe_seconds
+    buffer = np.zeros(pages * page_limit, dtype=candlestore.candle_dtype)  # time == 0 marks unfilled rows
+    url = f"{base_url}/data/v2/{endpoint}"
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124",
+        "Accept": "application/json"
+    }
+
+    def fetch_page(page):
+        params = {
+            "fsym": coin,
+            "tsym": vs_currency,
+            "limit": page_limit - 1,  # The API returns limit + 1 bars ending at toTs
+            "aggregate": aggregate,
+            "toTs": end - page * page_limit * timeframe_seconds,
+            "api_key": api_key
+        }
+        response = get_engine().get(url, params=params, headers=headers, label=f"{coin} {timeframe_seconds}s page {page}")
+        if response is None or response.status_code != 200:
+            return None
+        try:
+            candles = ingest.cryptocompare_candles(response.content)
+        except (ValueError, KeyError, TypeError):
+            return None
+        if candles is None:
+            return 0  # No bars that far back
+        count = min(page_limit, len(candles["time"]))
+        slot = buffer[page * page_limit:page * page_limit + count]
+        for name in candlestore.candle_dtype.names:
+            slot[name] = candles[name][-count:]
+        return count
+
+    print(f"Backfilling {coin}-{vs_currency} {endpoint} x{aggregate}: {pages} pages of {page_limit} bars")
+    received = 0
+    pending = list(range(pages))
+    for _ in range(backfill_rounds):
+        counts = get_engine().map(fetch_page, [(page,) for page in pending])
+        received += sum(count for count in counts if count is not None)
+        pending = [page for page, count in zip(pending, counts) if count is None]
+        if not pending:
+            break
+    if pending:
+        print(f"Warning: {len(pending)} of {pages} pages failed ({coin}-{vs_currency} {endpoint} x{aggregate}); "
+              f"the stored history has gaps until the next backfill.")
+    # Drop unfilled slots and the all-zero bars returned from before the pair was listed
+    records = buffer[(buffer["time"] > 0) & (buffer["Close"] > 0)]
+    if not pending and len(records) and records["time"].min() > start:
+        candlestore.write_earliest("cryptocompare", f"{coin}-{vs_currency}", f"{endpoint}{aggregate}",
+                                   records["time"].min())
+    stored = candlestore.append_records("cryptocompare", f"{coin}-{vs_currency}", f"{endpoint}{aggregate}", records)
+    print(f"Received {received} bars, stored {stored} unique bars.")
+    return stored
+
+# Base series fetched from the API. Every timeframe is aggregated locally
+# (resample.py) from the finest stored base that covers it, so all timeframes
+# agree with each other and a refresh costs one call per base instead of one
+# per timeframe. Days need their own base: 200 daily bars would take 144
+# pages of 1m history, more than the free tier keeps.
+base_timeframes = ["1m", "1h", "1d"]
+
+# Function to list the base series a timeframe can be aggregated from, finest first
+def base_candidates(timeframe_seconds):
+    return [timeframes[name] for name in base_timeframes if timeframe_seconds % timeframes[name] == 0]
+
+# Function to count the base bars that give max_candles bars of a timeframe
+# (plus one, as a leading partial bucket is dropped)
+def bars_needed(timeframe_seconds, base_seconds, max_candles):
+    return (max_candles + 1) * (timeframe_seconds // base_seconds)
+
+# Function to count the bars a base must hold to serve max_candles bars of every
+# timeframe for which it is the coarsest base
+def base_bars(base_seconds, max_candles):
+    return max(bars_needed(tf_seconds, base_seconds, max_candles)
+               for tf_seconds in timeframes.values() if base_candidates(tf_seconds)[-1] == base_seconds)
+
+# Function to read the stored base records needed to aggregate max_candles bars
+# of every timeframe the base is the coarsest for (None if nothing is stored)
+def stored_base(coin, vs_currency, base_seconds, max_candles):
+    endpoint, aggregate = select_endpoint(base_seconds)
+    records = candlestore.read_records("cryptocompare", f"{coin}-{vs_currency}", f"{endpoint}{aggregate}")
+    return None if records is None else np.array(records[-base_bars(base_seconds, max_candles):])
+
+# Function to bring a base series up to date with `bars` bars of history: an
+# incremental fetch when the store is current, a paged backfill when it is
+# short (too few bars, or holes from failed backfill pages in the last `bars`)
+# or further behind than one page. `bars` is capped at the history the API
+# serves, and at the stored history once it reaches the API's earliest bar.
+def fetch_base(coin, vs_currency, base_seconds, bars):
+    endpoint, aggregate = select_endpoint(base_seconds)
+    if endpoint in history_limits:
+        bars = min(bars, history_limits[endpoint] // base_seconds)
+    records = candlestore.read_records("cryptocompare", f"{coin}-{vs_currency}", f"{endpoint}{aggregate}")
+    if records is not None:
+        earliest = candlestore.read_earliest("cryptocompare", f"{coin}-{vs_currency}", f"{endpoint}{aggregate}")
+        if earliest is not None and int(records["time"][0]) <= earliest:
+            bars = min(bars, len(records))
+    short = records is None or len(records) < bars or \
+        int(records["time"][-1]) - int(records["time"][-bars]) > (bars - 1) * base_seconds * gap_tolerance
+    missing = bars if short else (int(time.time()) - int(records["time"][-1])) // base_seconds + 1
+    del records
+    if short or missing > page_limit:
+        return backfill(coin, vs_currency, base_seconds, missing * base_seconds / 86400)
+    return fetch_latest(coin, vs_currency, base_seconds, max(bars, missing))  # Every bar since the last stored one
+
+# Function to build a timeframe's candles from the stored base series (no
+# network): the finest base holding max_candles bars of it, otherwise the one
+# giving the most. Bases ending more than one bar of the timeframe behind the
+# most recent one are skipped, so a stale finer base never shadows a freshly
+# refreshed coarser one. max_candles=None returns the whole history.
+def derive_timeframe(coin, vs_currency, timeframe_seconds, max_candles=None):
+    stored = []
+    for base_seconds in base_candidates(timeframe_seconds):
+        endpoint, aggregate = select_endpoint(base_seconds)
+        records = candlestore.read_records("cryptocompare", f"{coin}-{vs_currency}", f"{endpoint}{aggregate}")
+        if records is not None:
+            stored.append((base_seconds, records, int(records["time"][-1]) + base_seconds))
+    latest_end = max((end for _, _, end in stored), default=0)
+
+    best = None
+    for base_seconds, records, end in stored:
+        if end < latest_end - timeframe_seconds:
+            continue
+        if max_candles is not None:
+            records = records[-bars_needed(timeframe_seconds, base_seconds, max_candles):]
+        if base_seconds == timeframe_seconds:
+            derived = np.array(records)  # Copy out of the memory map
+        else:
+            derived = resample.aggregate(records, timeframe_seconds)
+        if best is None or len(derived) > len(best):
+            best = derived
+        if max_candles is not None and len(derived) >= max_candles:
+            break
+    if best is None or len(best) == 0:
+        return None
+    return candlestore.records_frame(best if max_candles is None else best[-max_candles:])
+
+# Function to fetch data: refresh the timeframe's base series, then aggregate
+# the last max_candles bars from the store
+def fetch_data(coin, vs_currency, timeframe_seconds, max_candles, cache_only=False):
+    if not cache_only:
+        base_seconds = base_candidates(timeframe_seconds)[-1]
+        fetch_base(coin, vs_currency, base_seconds, bars_needed(timeframe_seconds, base_seconds, max_candles))
+    return derive_timeframe(coin, vs_currency, timeframe_seconds, max_candles)
+
+# Function to print the analysis of one timeframe
+def print_analysis(tf_name, data, candle_counts, bands, horizons=None, model="bootstrap", paths=10000):
+    print(f"Timeframe: {tf_name}")
+    if data is None:
+        print("  No data available.")
+        return
+    current_close = data["Close"].iloc[-1] if not data.empty else None
+    window_stats = calculate_window_stats(data, candle_counts)
+    window_probs = calculate_window_probabilities(data, candle_counts, current_close, bands)
+    horizon_probs = calculate_window_horizon_probabilities(data, candle_counts, current_close, horizons, bands, model,
+                                                           paths) if horizons else None
+
+    for count in candle_counts:
+        print(f"\n  Candle Count: {count}")
+        stats = window_stats[count]
+        if stats:
+            print("  Statistics:")
+            for metric, values in stats.items():
+                print(f"    {metric}: Mean={values['Mean']:.2f}, Median={values['Median']:.2f}, Variance={values['Variance']:.2f}")
+        else:
+            print("    Insufficient data for stats.")
+
+        probs = window_probs[count]
+        if probs:
+            print("  Probabilities:")
+            print(f"    Increase: {probs['Increase']:.2f}%")
+            print(f"    Decrease: {probs['Decrease']:.2f}%")
+            print(f"    Range: {probs['Range']:.2f}%")
+            print(f"    Range Thresholds: {probs['Range_Lower']:.2f} - {probs['Range_Upper']:.2f}")
+            for band, prob_range, lower, upper in probs["Bands"][1:]:
+                print(f"    Range ±{band} std: {prob_range:.2f}% ({lower:.2f} - {upper:.2f})")
+        else:
+            print("    Insufficient data for probabilities.")
+
+        if horizon_probs is not None:
+            horizons_result = horizon_probs[count]
+            if horizons_result:
+                print(f"  Monte Carlo ({model}, {paths} paths):")
+                for horizon, probs in horizons_result.items():
+                    if probs:
+                        print(f"    {horizon} bars: Increase={probs['Increase']:.2f}%, Decrease={probs['Decrease']:.2f}%, "
+                              f"Range={probs['Range']:.2f}% ({probs['Range_Lower']:.2f} - {probs['Range_Upper']:.2f})")
+            else:
+                print("    Insufficient data for simulation.")
+
+# Function to run the `crypto` subcommand
+def run(args):
+    global api_key
+    if args.api_key:
+        api_key = args.api_key
+    crypto_pairs = list(ticker_map) if args.all_pairs else args.pair
+    base_currency = args.currency
+    candle_counts = args.counts
+    unsupported = [pair for pair in crypto_pairs if pair not in ticker_map]
+    if unsupported:
+        print(f"Unsupported pair: {', '.join(unsupported)}. Available: {list(ticker_map.keys())}")
+        return
+    max_candles = max(candle_counts)
+    # One refresh per (pair, base series), run concurrently within the provider rate limit
+    base_jobs = [(ticker_map[pair], base_currency, timeframes[name], base_bars(timeframes[name], max_candles))
+                 for pair in crypto_pairs for name in base_timeframes]
+
+    if args.backfill:
+        for pair in crypto_pairs:
+            for tf_name in args.backfill_timeframes:
+                backfill(ticker_map[pair], base_currency, timeframes[tf_name], args.backfill)
+    elif args.backtest:
+        print(f"Probability Backtest for {', '.join(crypto_pairs)}\n")
+        # Bring the store up to date, then score the full stored history
+        if not args.cache_only:
+            get_engine().map(fetch_base, base_jobs)
+        series = {}
+        for pair in crypto_pairs:
+            for tf_name, tf_seconds in timeframes.items():
+                data = derive_timeframe(ticker_map[pair], base_currency, tf_seconds)
+                if data is not None and not data.empty:
+                    series[(pair, tf_name)] = data["Close"].to_numpy()
+        _, reports = backtest.backtest(series, candle_counts, band=args.bands[0])
+        for tf_name, count_reports in reports.items():
+            print(f"Timeframe: {tf_name}")
+            for count, report in count_reports.items():
+                backtest.print_report(count, report)
+    elif args.live or args.replay is not None:
+        print(f"Live Cryptocurrency Analysis for {', '.join(crypto_pairs)}\n")
+        if args.replay is not None:
+            frames = {(pair, tf_name): derive_timeframe(ticker_map[pair], base_currency, tf_seconds)
+                      for pair in crypto_pairs for tf_name, tf_seconds in timeframes.items()}
+            source = livefeed.ReplaySource(frames, speed=args.replay or None, warmup=max_candles)
+        else:
+            # Poll only the base series; coarser bars are aggregated as base bars close
+            get_engine().map(fetch_base, base_jobs)
+            feeds = {}
+            derived = {}
+            for pair in crypto_pairs:
+                coin = ticker_map[pair]
+                for name in base_timeframes:
+                    base_seconds = timeframes[name]
+                    feeds[(pair, name)] = (lambda coin=coin, base_seconds=base_seconds:
+                                           fetch_data(coin, base_currency, base_seconds, max_candles), base_seconds)
+                    derived[(pair, name)] = [((pair, tf_name), tf_seconds) for tf_name, tf_seconds in timeframes.items()
+                                             if tf_name not in base_timeframes and
+                                             base_candidates(tf_seconds)[-1] == base_seconds]
+            # Seed the derived timeframes from the stored base history, not the polled tail
+            history = lambda key: stored_base(ticker_map[key[0]], base_currency, timeframes[key[1]], max_candles)
+            source = livefeed.ResampledSource(livefeed.PollingSource(feeds), derived, history)
+        livefeed.run_live(source, candle_counts)
+    else:
+        if not args.cache_only:
+            get_engine().map(fetch_base, base_jobs)
+        for pair in crypto_pairs:
+            print(f"Cryptocurrency Analysis for {pair}\n")
+            for tf_name, tf_seconds in timeframes.items():
+                print_analysis(tf_name, derive_timeframe(ticker_map[pair], base_currency, tf_seconds, max_candles),
+                               candle_counts, args.bands, args.horizons, args.mc_model, args.paths)
@@ -0,0 +1,107 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from . import metrics
+
+# Documented request limits per provider as (calls, seconds) windows.
+# CryptoCompare free tier; raise these for paid keys.
+provider_limits = {
+    "cryptocompare": [(20, 1), (300, 60), (7500, 3600)]
+}
+
+# Status codes worth retrying (rate limits and transient server errors)
+retry_statuses = {429, 500, 502, 503, 504}
+
+# Token bucket: holds up to `calls` tokens and refills at calls/seconds
+class TokenBucket:
+    def __init__(self, calls, seconds):
+        self.capacity = float(calls)
+        self.tokens = float(calls)
+        self.fill_rate = calls / seconds
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Take a token, returning how long the caller must wait first
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.fill_rate
+
+# Limiter enforcing several windows at once (per second, per minute, ...)
+class RateLimiter:
+    def __init__(self, limits):
+        self.buckets = [TokenBucket(calls, seconds) for calls, seconds in limits]
+
+    def acquire(self):
+        wait = max([bucket.reserve() for bucket in self.buckets] + [0.0])
+        metrics.sleep(wait, "rate_limit")
+
+# Shared pooled session, rate limiter and worker pool for one provider
+class FetchEngine:
+    def __init__(self, limits, max_workers=8, retries=4, backoff=0.5, max_backoff=30.0):
+        self.limiter = RateLimiter(limits)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # Exponential backoff with full jitter; honours Retry-After when present (up to max_backoff)
+    def backoff_delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    # Function to GET a URL within the rate limit, retrying transient failures.
+    # Returns the final response (possibly a non-retryable error status) or None.
+    def get(self, url, params=None, headers=None, label=""):
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            if attempt:
+                metrics.inc("fetch_retries_total", host=host)
+            self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=30)
+            except requests.exceptions.RequestException as e:
+                metrics.inc("fetch_errors_total", host=host)
+                metrics.log_event("fetch_error", host=host, label=label, attempt=attempt,
+                                  seconds=time.perf_counter() - start, error=str(e))
+                print(f"Attempt {attempt + 1} failed for {label or url}: {e}")
+                if attempt == self.retries:
+                    return None
+                metrics.sleep(self.backoff_delay(attempt), "backoff")
+                continue
+
+            metrics.record_response(host, response, time.perf_counter() - start, label, attempt)
+
+            if response.status_code not in retry_statuses:
+                return response
+            if attempt == self.retries:
+                return response
+            delay = self.backoff_delay(attempt, response)
+            if response.status_code == 429:
+                print(f"Rate limit exceeded for {label or url}. Retrying in {delay:.1f}s...")
+            else:
+                print(f"Status {response.status_code} for {label or url}. Retrying in {delay:.1f}s...")
+            metrics.sleep(delay, "backoff")
+        return None
+
+    # Function to run fn(*job) for every job concurrently, keeping job order
+    def map(self, fn, jobs):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda job: fn(*job), jobs))
@@ -0,0 +1,80 @@
+import json
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson  # 2-3x faster than json on large responses
+except ImportError:  # Fall back to the standard library parser
+    orjson = None
+
+# Decoding layer between raw response bytes and DataFrames: parse once, pull
+# each field into a typed, contiguous NumPy column in a single C-level pass,
+# and build frames on those columns without copying them again.
+
+# CryptoCompare histo* candle fields -> candle store columns
+cryptocompare_fields = {
+    "time": ("time", np.int64),
+    "open": ("Open", np.float64),
+    "high": ("High", np.float64),
+    "low": ("Low", np.float64),
+    "close": ("Close", np.float64),
+    "volumeto": ("Volume", np.float64)  # volumeto is in quote currency (USD)
+}
+
+# marketdata.app chain columns kept by the options code, by type
+chain_integer_fields = ["expiration", "updated"]  # Epoch seconds
+chain_numeric_fields = ["strike", "delta", "gamma", "theta", "vega", "rho", "iv", "volume", "mid", "underlyingPrice"]
+chain_text_fields = ["optionSymbol", "side"]
+
+# Function to parse JSON bytes (or text)
+def loads(body):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+# Function to extract fields from a list of row dicts into typed columns,
+# one pass per field. `fields` maps row key -> (column name, dtype).
+def row_columns(rows, fields):
+    count = len(rows)
+    return {name: np.fromiter(map(itemgetter(key), rows), dtype=dtype, count=count)
+            for key, (name, dtype) in fields.items()}
+
+# Function to convert a column of list values to a typed array. Nulls become
+# NaN; an integer column holding nulls falls back to float.
+def list_column(values, dtype):
+    try:
+        return np.array(values, dtype=dtype)
+    except (TypeError, ValueError):
+        return np.array(values, dtype=np.float64)
+
+# Function to build a DatetimeIndex from epoch seconds without per-row conversion
+def epoch_index(seconds, tz=None):
+    index = pd.DatetimeIndex(np.asarray(seconds, dtype=np.int64).view("datetime64[s]"))
+    if tz is not None:
+        index = index.tz_localize("UTC").tz_convert(tz)
+    return index
+
+# Function to wrap typed columns in a DataFrame without copying them
+def columns_frame(columns, names, index=None):
+    return pd.DataFrame({name: columns[name] for name in names}, index=index, copy=False)
+
+# Function to decode a CryptoCompare histo* response into candle columns
+# (time, Open, High, Low, Close, Volume). None if it holds no candles.
+def cryptocompare_candles(body):
+    data = loads(body)
+    candles = data.get("Data", {}).get("Data", []) if isinstance(data, dict) else []
+    if not candles:
+        return None
+    return row_columns(candles, cryptocompare_fields)
+
+# Function to decode a marketdata.app chain response into typed columns.
+# Fields the response omits are left out. None if it holds no contracts.
+def marketdata_chain(body):
+    data = loads(body)
+    if not data or "optionSymbol" not in data:
+        return None
+    columns = {field: list_column(data[field], np.int64) for field in chain_integer_fields if field in data}
+    columns.update({field: list_column(data[field], np.float64) for field in chain_numeric_fields if field in data})
+    columns.update({field: list_column(data[field], object) for field in chain_text_fields if field in data})
+    return columns
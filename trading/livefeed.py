@@ -0,0 +1,155 @@
+import time
+import numpy as np
+import pandas as pd
+from . import candlestore
+from . import metrics
+from . import resample
+from . import rollingstats
+
+# Polls fetch functions for new bars. `feeds` maps a key such as
+# (symbol, timeframe) to (fetch, poll_seconds); fetch() returns the candle
+# history (the candle store means only the tail is downloaded). A bar is
+# emitted once a newer bar exists, i.e. after it has closed.
+class PollingSource:
+    def __init__(self, feeds):
+        self.feeds = feeds
+        self.last_emitted = {}
+        self.next_poll = {}
+
+    # Function to load the closed history for every key once at startup
+    def seed(self):
+        history = {}
+        for key, (fetch, _) in self.feeds.items():
+            data = fetch()
+            if data is None or len(data) < 2:
+                continue
+            closed = data.iloc[:-1]
+            history[key] = closed
+            self.last_emitted[key] = closed.index[-1]
+        return history
+
+    def __iter__(self):
+        while True:
+            now = time.monotonic()
+            for key, (fetch, poll_seconds) in self.feeds.items():
+                if now < self.next_poll.get(key, 0):
+                    continue
+                self.next_poll[key] = now + poll_seconds
+                data = fetch()
+                if data is None or len(data) < 2:
+                    continue
+                closed = data.iloc[:-1]
+                last = self.last_emitted.get(key)
+                if last is not None:
+                    closed = closed[closed.index > last]
+                for timestamp, bar in closed.iterrows():
+                    self.last_emitted[key] = timestamp
+                    yield key, timestamp, bar
+            wait = min(self.next_poll.values(), default=now + 1) - time.monotonic()
+            metrics.sleep(wait, "poll")
+
+# Plays back recorded candles (e.g. from the candle store) in timestamp order
+# across keys. `speed` is the replay rate relative to real time; None plays
+# back as fast as possible. The first `warmup` bars of each key seed the
+# estimators instead of being emitted.
+class ReplaySource:
+    def __init__(self, frames, speed=None, warmup=0):
+        self.frames = {key: df for key, df in frames.items() if df is not None and not df.empty}
+        self.speed = speed
+        self.warmup = warmup
+
+    def seed(self):
+        return {key: df.iloc[:self.warmup] for key, df in self.frames.items() if self.warmup > 0}
+
+    def __iter__(self):
+        events = []
+        for key, df in self.frames.items():
+            rest = df.iloc[self.warmup:]
+            events.extend((timestamp, i, key, rest) for i, timestamp in enumerate(rest.index))
+        events.sort(key=lambda event: (pd.Timestamp(event[0]).value, str(event[2])))
+
+        previous = None
+        for timestamp, i, key, rest in events:
+            if self.speed and previous is not None:
+                gap = (pd.Timestamp(timestamp) - pd.Timestamp(previous)).total_seconds() / self.speed
+                metrics.sleep(gap, "replay")
+            previous = timestamp
+            yield key, timestamp, rest.iloc[i]
+
+# Wraps a source of base bars and also emits the coarser timeframes derived
+# from them, so only the base series are polled. `derived` maps a base key to
+# [(derived key, seconds), ...]; a derived bar is emitted once the base series
+# moves past its bucket, matching the "closed once a newer bar exists" rule.
+# `history(base_key)` may return longer stored base records to seed the derived
+# timeframes from, when the polled base frames are too short to fill them.
+class ResampledSource:
+    def __init__(self, source, derived, history=None):
+        self.source = source
+        self.history = history
+        self.resamplers = {base_key: [(key, resample.Resampler(seconds)) for key, seconds in targets]
+                           for base_key, targets in derived.items()}
+        self.tz = {}
+
+    def seed(self):
+        history = self.source.seed()
+        for base_key, df in list(history.items()):
+            self.tz[base_key] = pd.DatetimeIndex(df.index).tz
+            records = self.history(base_key) if self.history is not None else None
+            if records is None:
+                records = candlestore.frame_to_records(df)
+            else:
+                # Only the closed bars the base key was seeded with; later ones arrive as updates
+                last_closed = int(pd.Timestamp(df.index[-1]).timestamp())
+                records = records[:np.searchsorted(records["time"], last_closed, side="right")]
+            for key, resampler in self.resamplers.get(base_key, []):
+                history[key] = candlestore.records_frame(resampler.seed(records), self.tz[base_key])
+        return history
+
+    def __iter__(self):
+        for base_key, timestamp, bar in self.source:
+            yield base_key, timestamp, bar
+            for key, resampler in self.resamplers.get(base_key, []):
+                closed = resampler.update(int(pd.Timestamp(timestamp).timestamp()), bar["Open"], bar["High"],
+                                          bar["Low"], bar["Close"], bar["Volume"])
+                if closed is None:
+                    continue
+                start = pd.Timestamp(closed[0], unit="s")
+                tz = self.tz.get(base_key)
+                if tz is not None:
+                    start = start.tz_localize("UTC").tz_convert(tz)
+                yield key, start, pd.Series(closed[1:], index=candlestore.price_columns, name=start)
+
+# Function to print the refreshed results for one key
+def print_update(key, timestamp, results):
+    print(f"\n{' '.join(str(part) for part in key)} bar {timestamp}")
+    for count, (stats, probs) in results.items():
+        if probs is None:
+            print(f"  Candle Count {count}: Insufficient data.")
+            continue
+        print(f"  Candle Count {count}: Close Mean={stats['Close']['Mean']:.2f}, "
+              f"Increase={probs['Increase']:.2f}%, Decrease={probs['Decrease']:.2f}%, "
+              f"Range={probs['Range']:.2f}% ({probs['Range_Lower']:.2f} - {probs['Range_Upper']:.2f})")
+
+# Function to run the live loop: seed one estimator per (key, candle count)
+# from history, then push every new bar into the estimators of its key only
+# and report the refreshed stats and probabilities for that key
+def run_live(source, candle_counts, on_update=print_update):
+    estimators = {}
+
+    def estimators_for(key):
+        if key not in estimators:
+            estimators[key] = {count: rollingstats.CandleEstimator(count) for count in candle_counts}
+        return estimators[key]
+
+    for key, history in source.seed().items():
+        for _, bar in history.tail(max(candle_counts)).iterrows():
+            for estimator in estimators_for(key).values():
+                estimator.update(bar)
+
+    for key, timestamp, bar in source:
+        results = {}
+        with metrics.timer("stage_seconds", stage="live_update"):
+            for count, estimator in estimators_for(key).items():
+                estimator.update(bar)
+                results[count] = (estimator.stats(), estimator.probabilities())
+        on_update(key, timestamp, results)
@@ -0,0 +1,184 @@
+import bisect
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Process-wide counters and histograms for fetch and compute stages. Recording
+# is a perf_counter read, one lock and a bisect (about a microsecond), so the
+# hooks stay on in production; JSON event lines are written only when a log
+# is configured (--metrics-log or $TRADING_METRICS_LOG).
+
+# Histogram bucket upper bounds in seconds
+latency_buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+bucket_labels = [f"{bound:g}" for bound in latency_buckets] + ["+Inf"]
+
+lock = threading.Lock()
+counters = {}  # (name, labels) -> value
+histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+help_texts = {
+    "fetch_requests_total": "HTTP responses received, by host and status code",
+    "fetch_request_seconds": "HTTP request latency (time to a complete response)",
+    "fetch_bytes_total": "Response body bytes received",
+    "fetch_retries_total": "Requests retried after an error or retryable status",
+    "fetch_rate_limited_total": "HTTP 429 responses",
+    "fetch_errors_total": "Requests that failed without a response",
+    "sleep_seconds_total": "Time spent sleeping for rate limits, backoff and pacing",
+    "decode_seconds": "JSON decode time",
+    "frame_seconds": "DataFrame construction time",
+    "rows_processed_total": "Rows handled by each stage",
+    "stage_seconds": "Time spent in each stats/probability/strategy function"
+}
+
+log_stream = None
+log_path = os.environ.get("TRADING_METRICS_LOG")
+
+# Function to turn keyword labels into a hashable, ordered key
+def label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+# Function to add to a counter
+def inc(name, value=1, **labels):
+    key = (name, label_key(labels))
+    with lock:
+        counters[key] = counters.get(key, 0) + value
+
+# Function to record one observation in a histogram
+def observe(name, value, **labels):
+    key = (name, label_key(labels))
+    index = bisect.bisect_left(latency_buckets, value)
+    with lock:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [0] * (len(latency_buckets) + 3)
+        histogram[index] += 1  # The last bucket slot is +Inf
+        histogram[-2] += value
+        histogram[-1] += 1
+
+# Context manager timing a block into a histogram
+@contextmanager
+def timer(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+# Decorator timing every call of a compute function under stage_seconds and
+# counting the rows of its first argument (a DataFrame, array or chain history)
+def instrument(stage):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(data, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(data, *args, **kwargs)
+            finally:
+                observe("stage_seconds", time.perf_counter() - start, stage=stage)
+                if data is not None and hasattr(data, "__len__"):
+                    inc("rows_processed_total", len(data), stage=stage)
+        return wrapper
+    return decorator
+
+# Function to record a completed HTTP request: latency, status, bytes and 429s
+def record_response(host, response, seconds, label="", attempt=0):
+    size = len(response.content)
+    observe("fetch_request_seconds", seconds, host=host)
+    inc("fetch_requests_total", host=host, status=response.status_code)
+    inc("fetch_bytes_total", size, host=host)
+    if response.status_code == 429:
+        inc("fetch_rate_limited_total", host=host)
+    log_event("fetch", host=host, label=label, attempt=attempt, status=response.status_code,
+              seconds=round(seconds, 6), bytes=size)
+
+# Function to sleep and account for it, so waits show up next to API and compute time
+def sleep(seconds, reason):
+    if seconds <= 0:
+        return
+    time.sleep(seconds)
+    inc("sleep_seconds_total", seconds, reason=reason)
+
+# Function to direct JSON event lines to a file ("-" for stderr); None turns them off
+def configure_log(path):
+    global log_path, log_stream
+    with lock:
+        if log_stream is not None and log_stream is not sys.stderr:
+            log_stream.close()
+        log_path, log_stream = path, None
+
+# Function to write one JSON event line if a log is configured
+def log_event(event, **fields):
+    if not log_path:
+        return
+    line = json.dumps({"ts": round(time.time(), 6), "event": event, **fields}, default=str)
+    global log_stream
+    with lock:
+        if log_stream is None:
+            log_stream = sys.stderr if log_path == "-" else open(log_path, "a", buffering=1)
+        log_stream.write(line + "\n")
+
+# Function to copy the current counters and histograms as plain data
+def snapshot():
+    with lock:
+        return {
+            "counters": [{"name": name, "labels": dict(labels), "value": value}
+                         for (name, labels), value in sorted(counters.items())],
+            "histograms": [{"name": name, "labels": dict(labels), "buckets": list(latency_buckets),
+                            "counts": values[:-2], "sum": values[-2], "count": values[-1]}
+                           for (name, labels), values in sorted(histograms.items())]
+        }
+
+# Function to format a label set in Prometheus syntax
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+# Function to render the snapshot in the Prometheus text exposition format
+def prometheus_text():
+    with lock:
+        counter_items = sorted(counters.items())
+        histogram_items = sorted((key, list(values)) for key, values in histograms.items())
+    lines = []
+    described = set()
+
+    def describe(name, kind):
+        if name not in described:
+            described.add(name)
+            if name in help_texts:
+                lines.append(f"# HELP {name} {help_texts[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in counter_items:
+        describe(name, "counter")
+        lines.append(f"{name}{format_labels(labels)} {value!r}")
+    for (name, labels), values in histogram_items:
+        describe(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(bucket_labels, values[:-2]):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {values[-2]!r}")
+        lines.append(f"{name}_count{format_labels(labels)} {values[-1]}")
+    return "\n".join(lines) + "\n"
+
+# Function to write the Prometheus snapshot to a file ("-" for stdout)
+def write_prometheus(path):
+    text = prometheus_text()
+    if path == "-":
+        sys.stdout.write(text)
+        return
+    with open(path + ".tmp", "w") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)  # Atomic for scrapers reading the file
+
+# Function to clear all recorded values
+def reset():
+    with lock:
+        counters.clear()
+        histograms.clear()
@@ -0,0 +1,127 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from . import probkernel
+
+# Monte Carlo Increase/Decrease/Range probabilities N bars ahead. Per-bar log
+# returns are drawn either by bootstrapping the window's own returns or from
+# a Student-t fitted to them, compounded over the horizon and counted at each
+# requested horizon. Paths are generated in chunks of (horizon, chunk_size)
+# draws, so memory stays fixed however many paths are asked for; every
+# scenario gets its own child stream of one SeedSequence, which makes results
+# reproducible no matter how scenarios are spread over worker processes.
+models = ("bootstrap", "student_t")
+default_model = "bootstrap"
+default_paths = 10000
+default_horizons = (1, 5, 10, 20)
+chunk_size = 4096  # Paths per generated batch
+batch_size = 64  # Scenarios per process pool task
+min_df, max_df = 2.5, 100.0  # Student-t degrees of freedom bounds (finite variance, near-normal)
+
+# Function to get the log returns of a close series (non-positive or missing closes dropped)
+def log_returns(closes):
+    closes = np.asarray(closes, dtype=np.float64)
+    closes = closes[np.isfinite(closes) & (closes > 0)]
+    return np.diff(np.log(closes))
+
+# Function to fit a Student-t to returns by the method of moments: degrees of
+# freedom from the excess kurtosis (df = 4 + 6 / excess), scale matching the
+# sample variance. Returns (location, scale, df).
+def fit_student_t(returns):
+    mean = returns.mean()
+    centered = returns - mean
+    variance = np.mean(centered ** 2)
+    excess = np.mean(centered ** 4) / variance ** 2 - 3 if variance > 0 else 0.0
+    df = float(np.clip(4 + 6 / excess, min_df, max_df)) if excess > 0 else max_df
+    return mean, returns.std(ddof=1) * np.sqrt((df - 2) / df), df
+
+# Function to draw a (steps, paths) block of per-bar log returns (paths along
+# the contiguous axis, so compounding over steps is a row-wise vector add)
+def draw_returns(rng, model, params, steps, paths):
+    if model == "bootstrap":
+        return params[rng.integers(0, len(params), size=(steps, paths))]
+    location, scale, df = params
+    return location + scale * rng.standard_t(df, size=(steps, paths))
+
+# Function to simulate one scenario and build calculate_probabilities-style
+# dicts per horizon. The range around the current close is band x the
+# window's close-change std x sqrt(horizon), so horizon 1 lines up with the
+# Gaussian estimate; an unchanged close counts half up, half down.
+def simulate(closes, horizons, current_close, bands=probkernel.default_bands, model=default_model,
+             paths=default_paths, seed=None):
+    if model not in models:
+        raise ValueError(f"Unknown Monte Carlo model {model!r}; expected one of {models}")
+    closes = np.asarray(closes, dtype=np.float64)
+    returns = log_returns(closes)
+    if len(returns) < 2 or current_close is None or not current_close > 0 or not horizons:
+        return {horizon: None for horizon in horizons}
+    steps = np.asarray(horizons, dtype=np.int64)
+    bands = np.asarray(bands, dtype=np.float64)
+    params = returns if model == "bootstrap" else fit_student_t(returns)
+    rng = np.random.default_rng(seed)
+
+    half_width = np.std(np.diff(closes), ddof=1) * np.sqrt(steps)[:, None] * bands
+    lower = current_close - half_width
+    upper = current_close + half_width
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_lower = np.where(lower > 0, np.log(lower / current_close), -np.inf)
+        log_upper = np.log(upper / current_close)
+
+    ups = np.zeros(len(steps))
+    ties = np.zeros(len(steps))
+    inside = np.zeros(half_width.shape)
+    for start in range(0, paths, chunk_size):
+        count = min(chunk_size, paths - start)
+        paths_block = draw_returns(rng, model, params, int(steps.max()), count)
+        for step in range(1, len(paths_block)):  # Row-wise adds beat np.cumsum(axis=0) several times here
+            paths_block[step] += paths_block[step - 1]
+        terminal = paths_block[steps - 1]
+        ups += np.count_nonzero(terminal > 0, axis=1)
+        ties += np.count_nonzero(terminal == 0, axis=1)
+        inside += np.count_nonzero((terminal[:, None, :] >= log_lower[..., None])
+                                   & (terminal[:, None, :] <= log_upper[..., None]), axis=2)
+
+    increase = (ups + ties / 2) / paths * 100
+    prob_range = inside / paths * 100
+    return {
+        horizon: {
+            "Increase": increase[i],
+            "Decrease": 100 - increase[i],
+            "Range": prob_range[i, 0],
+            "Range_Lower": lower[i, 0],
+            "Range_Upper": upper[i, 0],
+            "Bands": [(band, prob_range[i, k], lower[i, k], upper[i, k]) for k, band in enumerate(bands)]
+        }
+        for i, horizon in enumerate(horizons)
+    }
+
+# Worker: simulate a batch of (closes, current_close) scenarios with their seeds
+def simulate_batch(scenarios, seeds, horizons, bands, model, paths):
+    return [simulate(closes, horizons, current_close, bands, model, paths, seed)
+            for (closes, current_close), seed in zip(scenarios, seeds)]
+
+# Function to simulate many (closes, current_close) scenarios, batched over a
+# process pool (pass `executor` to reuse one, max_workers=1 to stay in-process).
+# Returns one {horizon: dict} per scenario, in order.
+def simulate_many(scenarios, horizons, bands=probkernel.default_bands, model=default_model, paths=default_paths,
+                  seed=None, max_workers=None, executor=None):
+    seeds = np.random.SeedSequence(seed).spawn(len(scenarios))
+    batches = [(scenarios[start:start + batch_size], seeds[start:start + batch_size])
+               for start in range(0, len(scenarios), batch_size)]
+    results = []
+    if executor is None and (max_workers == 1 or len(batches) <= 1):
+        for batch, batch_seeds in batches:
+            results.extend(simulate_batch(batch, batch_seeds, horizons, bands, model, paths))
+        return results
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(simulate_batch, batch, batch_seeds, horizons, bands, model, paths)
+                   for batch, batch_seeds in batches]
+        for future in futures:
+            results.extend(future.result())
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return results
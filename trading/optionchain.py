@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Per-contract numeric columns kept as float32 (stats columns first, in order)
+value_columns = ["delta", "gamma", "theta", "vega", "rho", "volume", "mid", "strike"]
+side_categories = ["call", "put"]
+
+# Columnar option chain history partitioned by trading date. Rows are stored
+# oldest date first, so the last N trading days are one contiguous slice
+# rows[offsets[-N]:]. Dates, expirations and sides are integer coded.
+class OptionChainHistory:
+    def __init__(self, partitions):
+        partitions = sorted(((date, df) for date, df in partitions if df is not None and not df.empty),
+                            key=lambda part: part[0])
+        self.dates = np.array([date for date, _ in partitions])
+        sizes = np.array([len(df) for _, df in partitions], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)))
+        rows = int(self.offsets[-1])
+
+        # One contiguous float32 block; values[:, i] is value_columns[i]
+        self.values = np.empty((rows, len(value_columns)), dtype=np.float32)
+        for (_, df), start, stop in zip(partitions, self.offsets[:-1], self.offsets[1:]):
+            for i, col in enumerate(value_columns):
+                self.values[start:stop, i] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float32)
+
+        self.date_codes = np.repeat(np.arange(len(partitions), dtype=np.int32), sizes)
+        if partitions:
+            expirations = np.concatenate([df["expiration"].to_numpy() for _, df in partitions])
+            sides = np.concatenate([df["side"].astype(str).str.lower().to_numpy() for _, df in partitions])
+        else:
+            expirations = np.array([], dtype=np.int64)
+            sides = np.array([], dtype=object)
+        self.expirations, codes = np.unique(expirations, return_inverse=True)
+        self.expiration_codes = codes.astype(np.int32)
+        self.side = pd.Categorical(sides, categories=side_categories)
+
+        # Per-date aggregates, computed once
+        mids = self.column("mid").astype(np.float64)
+        valid = ~np.isnan(mids)
+        mid_sums = np.bincount(self.date_codes, weights=np.where(valid, mids, 0), minlength=len(partitions))
+        mid_counts = np.bincount(self.date_codes, weights=valid, minlength=len(partitions))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.daily_mid = mid_sums / mid_counts
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df.groupby("date", sort=True))
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    @property
+    def num_dates(self):
+        return len(self.dates)
+
+    # Function to get the number of rows covering the last `days` trading dates
+    def window_rows(self, days):
+        if days > self.num_dates:
+            return None
+        return int(self.offsets[-1] - self.offsets[self.num_dates - days])
+
+    # Function to get a column as a float32 view, optionally for the last `days` dates
+    def column(self, name, days=None):
+        values = self.values[:, value_columns.index(name)]
+        if days is None:
+            return values
+        return values[self.offsets[self.num_dates - days]:]
+
+    # Function to get the block of the given columns for the last `days` dates
+    def window(self, columns, days=None):
+        indices = [value_columns.index(col) for col in columns]
+        start = 0 if days is None else self.offsets[self.num_dates - days]
+        if indices == list(range(indices[0], indices[0] + len(indices))):
+            return self.values[start:, indices[0]:indices[0] + len(indices)]  # Contiguous columns: a view
+        return self.values[start:, indices]
+
+    # Function to rebuild a DataFrame (e.g. for one date) when pandas is needed
+    def to_frame(self, days=None):
+        start = 0 if days is None else int(self.offsets[self.num_dates - days])
+        df = pd.DataFrame(self.values[start:], columns=value_columns)
+        df["expiration"] = self.expirations[self.expiration_codes[start:]]
+        df["side"] = self.side[start:]
+        df["date"] = self.dates[self.date_codes[start:]]
+        return df
@@ -0,0 +1,267 @@
+import os
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+import numpy as np
+import pandas as pd
+from . import blackscholes
+from . import chaincache
+from . import ingest
+from . import metrics
+from . import optionchain
+from . import probkernel
+from . import strategyscan
+from . import windowstats
+
+api_key = os.environ.get("MARKETDATA_API_KEY", "YOUR_MARKETDATA_API_KEY")  # Get free key at https://marketdata.app/
+# Overridable so benchmarks can point at a local stand-in server
+base_url = os.environ.get("MARKETDATA_BASE_URL", "https://api.marketdata.app")
+supported_tickers = ["SPY", "QQQ"]
+
+# Function to build the chain DataFrame on the decoded chain columns (see
+# ingest.marketdata_chain). The frame holds only the kept columns, wrapped
+# without copying, and missing Greeks are filled into it in place.
+def chain_frame(columns, ticker, date=None):
+    required_cols = ["optionSymbol", "strike", "expiration", "side", "delta", "gamma", 
+                    "theta", "vega", "rho", "volume", "mid"]
+    greek_cols = ["delta", "gamma", "theta", "vega", "rho", "iv"]
+    if not all(col in columns for col in required_cols if col not in greek_cols):
+        print(f"Missing required columns for {ticker}.")
+        return None
+
+    count = len(columns["optionSymbol"])
+    df = pd.DataFrame({col: columns[col] if col in columns else np.full(count, np.nan)
+                       for col in required_cols + ["iv", "underlyingPrice"]}, copy=False)
+
+    # Fill missing Greeks/IV locally from strike, expiration, side and mid
+    df = fill_greeks(df, date, updated=columns.get("updated"), copy=False)
+    if df is None:
+        print(f"Missing Greeks and underlying price for {ticker}.")
+        return None
+    return df
+
+# Function to fetch options chain data
+def fetch_options_data(ticker, api_key, date=None):
+    # Past chains never change; serve them from the snapshot cache
+    if date and chaincache.is_cached(ticker, date):
+        return chaincache.load_chain(ticker, date)
+    import requests  # Only needed on a cache miss
+    try:
+        url = f"{base_url}/v1/options/chain/{ticker}/"
+        params = {"token": api_key}
+        if date:
+            params["date"] = date
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124",
+            "Accept": "application/json"
+        }
+
+        print(f"Fetching URL: {url} with params: {params}")
+        start = time.perf_counter()
+        response = requests.get(url, params=params, headers=headers)
+        metrics.record_response(urlsplit(url).netloc, response, time.perf_counter() - start, f"{ticker} {date or 'today'}")
+        print(f"Status Code: {response.status_code}")
+        response.raise_for_status()
+
+        with metrics.timer("decode_seconds", source="marketdata"):
+            columns = ingest.marketdata_chain(response.content)
+        if columns is None:
+            print(f"No valid data for {ticker} on {date or 'today'}.")
+            chaincache.mark_empty(ticker, date)
+            return None
+
+        with metrics.timer("frame_seconds", source="marketdata"):
+            df = chain_frame(columns, ticker, date)
+        if df is None:
+            return None
+        metrics.inc("rows_processed_total", len(df), stage="marketdata.frame")
+        chaincache.save_chain(ticker, date, df)
+        return df
+    except requests.exceptions.HTTPError as e:
+        if response.status_code == 404:
+            print(f"No chain for {ticker} on {date or 'today'}.")
+            chaincache.mark_empty(ticker, date)
+        elif response.status_code == 429:
+            print(f"Rate limit exceeded for {ticker}. Retry later.")
+        elif response.status_code == 401:
+            print(f"401 Unauthorized for {ticker}. Check API key at https://marketdata.app/.")
+        return None
+    except Exception as e:
+        print(f"Error fetching data for {ticker}: {e}")
+        return None
+
+# Function to compute Greeks and implied volatility for contracts the provider left
+# without them. Returns None if they are missing and cannot be computed.
+# `updated` (quote epoch seconds per row) defaults to the frame's column;
+# copy=False fills the given frame in place.
+def fill_greeks(df, date=None, underlying_price=None, as_of=None, updated=None, copy=True):
+    greek_cols = ["delta", "gamma", "theta", "vega", "rho", "iv"]
+    if copy:
+        df = df.copy()
+    for col in greek_cols + ["underlyingPrice"]:
+        if col not in df.columns:
+            df[col] = np.nan
+        elif df[col].dtype.kind != "f":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    if underlying_price is not None:
+        df["underlyingPrice"] = underlying_price
+
+    missing = df[greek_cols].isna().any(axis=1).to_numpy()
+    if not missing.any():
+        return df
+    if df.loc[missing, "underlyingPrice"].isna().any():
+        return None if df[greek_cols[:-1]].isna().all().any() else df
+
+    # Value contracts as of their quote time, or the close of a historical date
+    if updated is None and "updated" in df.columns:
+        updated = df["updated"]
+    if as_of is None and updated is not None:
+        as_of = pd.to_numeric(pd.Series(updated), errors="coerce").to_numpy(dtype=float)[missing]
+    elif as_of is None and date:
+        as_of = pd.Timestamp(f"{date} 16:00", tz="America/New_York").timestamp()
+    computed = blackscholes.chain_greeks(df.loc[missing], df.loc[missing, "underlyingPrice"].to_numpy(), as_of)
+    for col in greek_cols:
+        df.loc[missing, col] = df.loc[missing, col].fillna(computed[col])
+    return df
+
+# Function to recompute every contract's Greeks/IV intraday at a new underlying
+# price, without another API call
+def refresh_greeks(df, underlying_price):
+    df = df.drop(columns=["delta", "gamma", "theta", "vega", "rho", "iv"], errors="ignore")
+    return fill_greeks(df, underlying_price=underlying_price, as_of=time.time(), copy=False)  # drop() already copied
+
+# Function to fetch historical data for a period
+def fetch_historical_data(ticker, api_key, days, cache_only=False):
+    historical_data = []
+    end_date = datetime.now()
+    days_fetched = 0
+    max_requests = 100  # Free tier limit
+
+    while days_fetched < days and len(historical_data) < max_requests:
+        date_str = (end_date - timedelta(days=days_fetched)).strftime("%Y-%m-%d")
+        cached = chaincache.is_cached(ticker, date_str)
+        if cached or not cache_only:
+            data = fetch_options_data(ticker, api_key, date_str)
+        else:
+            data = None
+        if data is not None:
+            historical_data.append((date_str, data))
+        days_fetched += 1
+        if not cached and not cache_only:
+            metrics.sleep(1, "options_pacing")  # Avoid rate limits
+
+        # Skip weekends (options markets closed)
+        while (end_date - timedelta(days=days_fetched)).weekday() >= 5:
+            days_fetched += 1
+
+    # Columnar, date-partitioned container (dates stored oldest first)
+    return optionchain.OptionChainHistory(historical_data) if historical_data else None
+
+# Greek/volume columns summarized by calculate_stats, with display names
+stats_columns = ["delta", "gamma", "theta", "vega", "rho", "volume"]
+stats_names = ["Delta", "Gamma", "Theta", "Vega", "Rho", "Volume"]
+
+# Function to calculate stats for Greeks and volume for every period in one pass
+@metrics.instrument("options.calculate_window_stats")
+def calculate_window_stats(data, periods):
+    if data is None:
+        return {days: None for days in periods}
+
+    # A window of the last N trading days is a contiguous trailing block of rows
+    window_rows = [data.window_rows(days) for days in periods]
+    results = windowstats.window_stats(data.window(stats_columns), stats_columns,
+                                       [rows if rows is not None else len(data) + 1 for rows in window_rows])
+    return {
+        days: windowstats.stats_dict(results[i], stats_names) if window_rows[i] is not None else None
+        for i, days in enumerate(periods)
+    }
+
+# Function to calculate stats for Greeks and volume
+def calculate_stats(data, days):
+    return calculate_window_stats(data, [days])[days]
+
+# Function to calculate mid-price probabilities for every period in one kernel pass
+@metrics.instrument("options.calculate_window_probabilities")
+def calculate_window_probabilities(data, periods, current_mid, bands=probkernel.default_bands):
+    if data is None:
+        return {days: None for days in periods}
+    # Average mid across the chain per date (precomputed); its day-to-day changes drive the model
+    return probkernel.window_probabilities(data.daily_mid, periods, current_mid, bands)
+
+# Function to calculate probabilities
+def calculate_probabilities(data, days, current_mid, bands=probkernel.default_bands):
+    return calculate_window_probabilities(data, [days], current_mid, bands)[days]
+
+# Function to suggest strategies: the best candidate of each structure found by
+# scanning the chain (straddles, verticals, iron condors, covered calls)
+@metrics.instrument("options.suggest_strategies")
+def suggest_strategies(data, as_of=None):
+    if data is None:
+        return ["No data for strategy suggestions."]
+    spot = data["underlyingPrice"].dropna() if "underlyingPrice" in data.columns else pd.Series(dtype=float)
+    if spot.empty:
+        return ["No underlying price for a strategy scan."]
+
+    strategies = []
+    for name, table in strategyscan.scan_strategies(data, spot.iloc[0], as_of=as_of, n=1).items():
+        best = table.iloc[0]
+        expiration = pd.to_datetime(best["Expiration"], unit="s") if np.issubdtype(type(best["Expiration"]), np.number) \
+            else pd.to_datetime(best["Expiration"])
+        breakevens = " / ".join(f"{be:.2f}" for be in (best["Breakeven_Lower"], best["Breakeven_Upper"]) if np.isfinite(be))
+        strategies.append(f"{name} {expiration:%Y-%m-%d} [{best['Legs']}]: Max Loss={best['Max_Loss']:.2f}, "
+                          f"Breakeven={breakevens}, PoP={best['PoP']:.2f}%")
+
+    return strategies if strategies else ["No candidate structures passed the liquidity/delta filters."]
+
+# Function to run the `options` subcommand
+def run(args):
+    ticker = args.ticker
+    key = args.api_key or api_key
+    periods = args.periods
+    if ticker not in supported_tickers:
+        print(f"Unsupported ticker: {ticker}. Available: {', '.join(supported_tickers)}")
+        return
+
+    print(f"Options Analysis for {ticker}\n")
+    # Fetch the longest period once; shorter periods slice the most recent dates from it
+    history = fetch_historical_data(ticker, key, max(periods), args.cache_only)
+
+    # Current mid-price (average across chain)
+    current_data = None if args.cache_only else fetch_options_data(ticker, key)
+    current_mid = current_data["mid"].mean() if current_data is not None else None
+    window_stats = calculate_window_stats(history, periods)
+    window_probs = calculate_window_probabilities(history, periods, current_mid, args.bands)
+
+    for period in periods:
+        print(f"Period: Last {period} Trading Days")
+        if history is None:
+            print("  No data available.")
+            continue
+
+        # Calculate stats
+        stats = window_stats[period]
+        if stats:
+            print("  Statistics:")
+            for metric, values in stats.items():
+                print(f"    {metric}: Mean={values['Mean']:.4f}, Median={values['Median']:.4f}, Variance={values['Variance']:.4f}")
+        else:
+            print("    Insufficient data for stats.")
+
+        # Calculate probabilities
+        probs = window_probs[period]
+        if probs:
+            print("  Probabilities (Mid-Price):")
+            print(f"    Increase: {probs['Increase']:.2f}%")
+            print(f"    Decrease: {probs['Decrease']:.2f}%")
+            print(f"    Range: {probs['Range']:.2f}%")
+            print(f"    Range Thresholds: {probs['Range_Lower']:.2f} - {probs['Range_Upper']:.2f}")
+            for band, prob_range, lower, upper in probs["Bands"][1:]:
+                print(f"    Range ±{band} std: {prob_range:.2f}% ({lower:.2f} - {upper:.2f})")
+        else:
+            print("    Insufficient data for probabilities.")
+
+        # Suggest strategies
+        strategies = suggest_strategies(current_data)
+        print("  Strategy Suggestions:")
+        for strategy in strategies:
+            print(f"    - {strategy}")
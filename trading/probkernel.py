@@ -0,0 +1,80 @@
+import numpy as np
+from scipy.special import ndtr
+
+# Default range band(s) in standard deviations around the current price
+default_bands = (1.5,)
+
+# Function to compute the Gaussian Increase/Decrease/Range probabilities for
+# arrays of change means, change stds and current prices in one ufunc pass.
+# Inputs broadcast together; Range/Range_Lower/Range_Upper gain a trailing
+# axis with one entry per band. Probabilities are in percent.
+def gaussian_probabilities(mean_change, std_change, current, bands=default_bands):
+    mean_change, std_change, current = np.broadcast_arrays(
+        np.asarray(mean_change, dtype=np.float64),
+        np.asarray(std_change, dtype=np.float64),
+        np.asarray(current, dtype=np.float64))
+    bands = np.asarray(bands, dtype=np.float64)
+    # A zero or undefined spread has no distribution (scipy's norm.cdf gives NaN too)
+    std = np.where(std_change > 0, std_change, np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        prob_decrease = ndtr(-mean_change / std)
+        half_width = std_change[..., None] * bands
+        upper_z = (half_width - mean_change[..., None]) / std[..., None]
+        lower_z = (-half_width - mean_change[..., None]) / std[..., None]
+        prob_range = ndtr(upper_z) - ndtr(lower_z)
+
+    return {
+        "Increase": (1 - prob_decrease) * 100,
+        "Decrease": prob_decrease * 100,
+        "Range": prob_range * 100,
+        "Range_Lower": current[..., None] - half_width,
+        "Range_Upper": current[..., None] + half_width
+    }
+
+# Function to get the mean and sample std of the close-to-close changes inside
+# the trailing `count` closes, for every count at once (NaN when too short)
+def change_moments(closes, counts):
+    closes = np.asarray(closes, dtype=np.float64)
+    counts = [int(c) for c in counts]
+    means = np.full(len(counts), np.nan)
+    stds = np.full(len(counts), np.nan)
+    max_count = min(max(counts, default=0), len(closes))
+    if max_count < 2:
+        return means, stds
+
+    changes = np.diff(closes[len(closes) - max_count:])[::-1]
+    shift = changes.mean()
+    centered = changes - shift
+    sums = np.cumsum(centered)
+    squares = np.cumsum(centered * centered)
+    for i, count in enumerate(counts):
+        n = count - 1
+        if count > len(closes) or n < 1:
+            continue
+        means[i] = sums[n - 1] / n + shift
+        if n > 1:
+            stds[i] = np.sqrt(max(squares[n - 1] - sums[n - 1] ** 2 / n, 0) / (n - 1))
+    return means, stds
+
+# Function to build calculate_probabilities-style dicts for every count.
+# The first band fills Range/Range_Lower/Range_Upper; all bands are listed
+# under "Bands" as (band, range, lower, upper).
+def window_probabilities(closes, counts, current, bands=default_bands):
+    means, stds = change_moments(closes, counts)
+    probs = gaussian_probabilities(means, stds, current, bands)
+    results = {}
+    for i, count in enumerate(counts):
+        if count > len(closes) or current is None:
+            results[count] = None
+            continue
+        results[count] = {
+            "Increase": probs["Increase"][i],
+            "Decrease": probs["Decrease"][i],
+            "Range": probs["Range"][i, 0],
+            "Range_Lower": probs["Range_Lower"][i, 0],
+            "Range_Upper": probs["Range_Upper"][i, 0],
+            "Bands": [(band, probs["Range"][i, k], probs["Range_Lower"][i, k], probs["Range_Upper"][i, k])
+                      for k, band in enumerate(bands)]
+        }
+    return results
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+from . import candlestore
+
+# Derives coarser OHLCV timeframes from a finer base series. Buckets are
+# aligned to multiples of the timeframe counted from an origin (the epoch, so
+# 5m/30m/1h/4h/1d buckets start on the usual boundaries and US sessions'
+# 9:30 open falls on a 30m boundary); weeks start on Monday.
+week_seconds = 604800
+week_origin = 4 * 86400  # 1970-01-05, the first Monday after the epoch
+
+# Function to pick the bucket origin for a timeframe
+def origin_for(seconds):
+    return week_origin if seconds % week_seconds == 0 else 0
+
+# Function to map epoch seconds to the start of their bucket
+def bucket_starts(times, seconds, origin=None):
+    if origin is None:
+        origin = origin_for(seconds)
+    return (np.asarray(times, dtype=np.int64) - origin) // seconds * seconds + origin
+
+# Function to aggregate time-sorted candle records into `seconds` buckets in one
+# vectorized pass: open/close from each bucket's first/last bar, high/low/volume
+# with ufunc.reduceat over the bucket boundaries. A leading bucket the base
+# series only partly covers is dropped; the last bucket may still be forming.
+def aggregate(records, seconds, origin=None):
+    if len(records) == 0:
+        return np.empty(0, dtype=candlestore.candle_dtype)
+    times = np.asarray(records["time"])
+    keys = bucket_starts(times, seconds, origin)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.append(starts[1:], len(keys))
+
+    result = np.empty(len(starts), dtype=candlestore.candle_dtype)
+    result["time"] = keys[starts]
+    result["Open"] = records["Open"][starts]
+    result["High"] = np.fmax.reduceat(np.asarray(records["High"]), starts)
+    result["Low"] = np.fmin.reduceat(np.asarray(records["Low"]), starts)
+    result["Close"] = records["Close"][ends - 1]
+    result["Volume"] = np.add.reduceat(np.nan_to_num(np.asarray(records["Volume"])), starts)
+    if times[0] > keys[0]:
+        result = result[1:]
+    return result
+
+# Function to resample a candle DataFrame (DatetimeIndex, OHLCV columns) to `seconds` buckets
+def aggregate_frame(df, seconds, origin=None):
+    if df is None or df.empty:
+        return df
+    records = candlestore.frame_to_records(df)
+    return candlestore.records_frame(aggregate(records, seconds, origin), tz=pd.DatetimeIndex(df.index).tz)
+
+# Incremental resampler for one target timeframe: base bars are fed in time
+# order and update the open bucket in place; a bucket is returned as closed
+# once a base bar from a later bucket arrives.
+class Resampler:
+    def __init__(self, seconds, origin=None):
+        self.seconds = seconds
+        self.origin = origin_for(seconds) if origin is None else origin
+        self.bar = None  # [start, open, high, low, close, volume] of the open bucket
+        self.partial = False  # Open bucket started mid-way (no seed history); never emitted
+
+    # Function to start from stored base history; returns the closed buckets
+    # (candle records) and keeps the last one open for further updates
+    def seed(self, records):
+        buckets = aggregate(records, self.seconds, self.origin)
+        if len(buckets) == 0:
+            return buckets
+        self.bar = [int(value) if i == 0 else float(value) for i, value in enumerate(buckets[-1].tolist())]
+        self.partial = False
+        return buckets[:-1]
+
+    # Function to add one base bar (epoch seconds of its open time); returns
+    # the bucket it closed as a tuple in candle_dtype field order, or None
+    def update(self, time, open_, high, low, close, volume):
+        start = int(bucket_starts(time, self.seconds, self.origin))
+        bar = self.bar
+        if bar is not None and start < bar[0]:
+            return None  # Base bar older than the open bucket (already counted)
+        if bar is not None and start == bar[0]:
+            bar[2] = max(bar[2], high)
+            bar[3] = min(bar[3], low)
+            bar[4] = close
+            bar[5] += volume
+            return None
+        closed = tuple(bar) if bar is not None and not self.partial else None
+        self.partial = bar is None and time > start
+        self.bar = [start, open_, high, low, close, volume]
+        return closed
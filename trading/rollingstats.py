@@ -0,0 +1,175 @@
+import math
+from bisect import bisect_left, insort
+from collections import deque
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:  # Fall back to a plain sorted list (O(n) inserts, still fast for small windows)
+    SortedList = None
+
+# Recompute the running moments from the window every this many updates to
+# cancel floating-point drift from repeated add/remove steps
+resync_interval = 10000
+
+# Running mean/variance over the last `window` values (Welford with removal).
+# NaN/inf values hold their place in the window but are left out of the
+# moments, like pandas' rolling mean/var skip NaN.
+class RollingMoments:
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.count = 0  # Finite values in the window
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+
+    def push(self, x):
+        self.values.append(x)
+        if math.isfinite(x):
+            self.add(x)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isfinite(old):
+                self.discard(old)
+        self.updates += 1
+        if self.updates % resync_interval == 0:
+            self.resync()
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def discard(self, x):
+        if self.count == 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        old_mean = self.mean
+        self.mean = (self.count * self.mean - x) / (self.count - 1)
+        self.m2 -= (x - old_mean) * (x - self.mean)
+        self.count -= 1
+
+    def resync(self):
+        finite = [v for v in self.values if math.isfinite(v)]
+        self.count = len(finite)
+        self.mean = sum(finite) / self.count if self.count else 0.0
+        self.m2 = sum((v - self.mean) ** 2 for v in finite)
+
+    # Number of finite values in the window
+    def __len__(self):
+        return self.count
+
+    # Sample variance (ddof=1), matching pandas .var()
+    def variance(self):
+        n = self.count
+        return max(self.m2, 0.0) / (n - 1) if n > 1 else math.nan
+
+    def std(self):
+        return math.sqrt(self.variance())
+
+# Rolling median over the last `window` values using an order-statistics list
+# (non-finite values are kept out of the list: NaN cannot be ordered or found)
+class RollingMedian:
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.sorted = SortedList() if SortedList is not None else []
+
+    def push(self, x):
+        self.values.append(x)
+        if math.isfinite(x):
+            self.insert(x)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isfinite(old):
+                self.remove(old)
+
+    def insert(self, x):
+        if SortedList is not None:
+            self.sorted.add(x)
+        else:
+            insort(self.sorted, x)
+
+    def remove(self, x):
+        if SortedList is not None:
+            self.sorted.remove(x)
+        else:
+            del self.sorted[bisect_left(self.sorted, x)]
+
+    def median(self):
+        n = len(self.sorted)
+        if n == 0:
+            return math.nan
+        mid = n // 2
+        if n % 2:
+            return self.sorted[mid]
+        return (self.sorted[mid - 1] + self.sorted[mid]) / 2
+
+# Gaussian CDF without the scipy per-call overhead
+def normal_cdf(x, mean, std):
+    if not std > 0:
+        return math.nan
+    return 0.5 * (1 + math.erf((x - mean) / (std * math.sqrt(2))))
+
+# Incremental equivalent of calculate_stats/calculate_probabilities for one
+# candle count: feed one bar at a time with update()
+class CandleEstimator:
+    def __init__(self, count, columns=("High", "Low", "Close", "Volume")):
+        self.count = count
+        self.columns = list(columns)
+        self.moments = {col: RollingMoments(count) for col in self.columns}
+        self.medians = {col: RollingMedian(count) for col in self.columns}
+        # calculate_probabilities uses the count - 1 close diffs inside the window
+        self.changes = RollingMoments(max(count - 1, 1))
+        self.last_close = None
+        self.bars = 0
+
+    # Add one candle (any mapping with the stats columns, e.g. a DataFrame row)
+    def update(self, candle):
+        for col in self.columns:
+            value = float(candle[col])
+            self.moments[col].push(value)
+            self.medians[col].push(value)
+        close = float(candle["Close"])
+        if self.last_close is not None:
+            self.changes.push(close - self.last_close)
+        self.last_close = close
+        self.bars += 1
+
+    def ready(self):
+        return self.bars >= self.count
+
+    # Same structure as calculate_stats
+    def stats(self):
+        if not self.ready():
+            return None
+        return {
+            col: {
+                "Mean": self.moments[col].mean if len(self.moments[col]) else math.nan,
+                "Median": self.medians[col].median(),
+                "Variance": self.moments[col].variance()
+            }
+            for col in self.columns
+        }
+
+    # Same structure as calculate_probabilities
+    def probabilities(self, current_close=None, band=1.5):
+        if not self.ready():
+            return None
+        if current_close is None:
+            current_close = self.last_close
+        mean_change = self.changes.mean
+        std_change = self.changes.std()
+        prob_decrease = normal_cdf(0, mean_change, std_change)
+        range_lower = current_close - band * std_change
+        range_upper = current_close + band * std_change
+        prob_range = normal_cdf(range_upper - current_close, mean_change, std_change) - \
+            normal_cdf(range_lower - current_close, mean_change, std_change)
+        return {
+            "Increase": (1 - prob_decrease) * 100,
+            "Decrease": prob_decrease * 100,
+            "Range": prob_range * 100,
+            "Range_Lower": range_lower,
+            "Range_Upper": range_upper
+        }
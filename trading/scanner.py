@@ -0,0 +1,122 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+from . import candlestore
+from . import montecarlo
+from . import probkernel
+from . import windowstats
+
+# Columns passed to the workers (order matters: Close is used for probabilities)
+scan_columns = ["High", "Low", "Close", "Volume"]
+
+# Function to download many tickers in batched multi-symbol requests.
+# Each batch asks only for bars since the oldest last-stored bar of its
+# tickers; results go to the candle store and are read back from there.
+def download_batches(tickers, interval, period, lookback_days=None, batch_size=100):
+    import yfinance as yf  # Heavy import; only needed when downloading
+    frames = {}
+    for start in range(0, len(tickers), batch_size):
+        batch = tickers[start:start + batch_size]
+        last_stamps = [candlestore.last_timestamp("yfinance", ticker, interval) for ticker in batch]
+        since = None
+        if all(ts is not None for ts in last_stamps):
+            since = datetime.fromtimestamp(min(last_stamps), timezone.utc)
+            if lookback_days is not None and datetime.now(timezone.utc) - since > timedelta(days=lookback_days):
+                since = None
+        try:
+            if since is not None:
+                data = yf.download(batch, start=since, interval=interval, group_by="ticker",
+                                   threads=True, progress=False, multi_level_index=True)
+            else:
+                data = yf.download(batch, period=period, interval=interval, group_by="ticker",
+                                   threads=True, progress=False, multi_level_index=True)
+        except Exception as e:
+            print(f"Error downloading batch starting at {batch[0]} for {interval}: {e}")
+            data = None
+
+        for ticker in batch:
+            if data is not None and not data.empty and ticker in data.columns.get_level_values(0):
+                candlestore.append_candles("yfinance", ticker, interval, data[ticker].dropna(how="all"))
+            stored = candlestore.load_candles("yfinance", ticker, interval)
+            if stored is not None and not stored.empty:
+                frames[ticker] = stored
+    return frames
+
+# Worker: window stats and close-change moments for one symbol/timeframe across
+# all counts. Takes a plain (rows, columns) array so only numbers cross the
+# process boundary; probabilities are computed for every row at once in scan().
+def analyze_symbol(ticker, tf_name, values, counts):
+    results = windowstats.window_stats(values, scan_columns, counts)
+    closes = values[:, scan_columns.index("Close")]
+    means, stds = probkernel.change_moments(closes, counts)
+    rows = []
+    for i, count in enumerate(counts):
+        if len(values) < count:
+            continue
+        row = {
+            "Ticker": ticker,
+            "Timeframe": tf_name,
+            "Count": count,
+            "Close": closes[-1],
+            "Mean_Change": means[i],
+            "Std_Change": stds[i]
+        }
+        for j, col in enumerate(scan_columns):
+            row[f"{col} Mean"] = results[i, j, 0]
+            row[f"{col} Variance"] = results[i, j, 2]
+        rows.append(row)
+    return rows
+
+# Function to add probability columns to a scan table with one kernel pass
+def add_probabilities(table, bands=probkernel.default_bands):
+    probs = probkernel.gaussian_probabilities(table["Mean_Change"].to_numpy(), table["Std_Change"].to_numpy(),
+                                              table["Close"].to_numpy(), bands)
+    table["Increase"] = probs["Increase"]
+    table["Decrease"] = probs["Decrease"]
+    table["Range"] = probs["Range"][:, 0]
+    table["Range_Lower"] = probs["Range_Lower"][:, 0]
+    table["Range_Upper"] = probs["Range_Upper"][:, 0]
+    for k, band in enumerate(bands[1:], start=1):
+        table[f"Range {band}"] = probs["Range"][:, k]
+    return table
+
+# Function to add Monte Carlo columns ("Increase 5 bars", "Range 5 bars", ...)
+# to a scan table; every (ticker, count) row is one scenario on the pool
+def add_horizon_probabilities(table, closes, horizons, bands, model, paths, executor):
+    scenarios = [(closes[ticker][len(closes[ticker]) - count:], close)
+                 for ticker, count, close in zip(table["Ticker"], table["Count"], table["Close"])]
+    results = montecarlo.simulate_many(scenarios, horizons, bands, model, paths, executor=executor)
+    for horizon in horizons:
+        table[f"Increase {horizon} bars"] = [result[horizon]["Increase"] if result[horizon] else np.nan
+                                             for result in results]
+        table[f"Range {horizon} bars"] = [result[horizon]["Range"] if result[horizon] else np.nan
+                                          for result in results]
+    return table
+
+# Function to scan a universe of tickers: batched downloads per timeframe,
+# per-symbol work fanned out over a process pool, one ranked table per timeframe
+def scan(tickers, timeframes, counts, periods, lookback_days=None, rank_by="Increase", max_workers=None,
+         bands=probkernel.default_bands, horizons=None, model=montecarlo.default_model, paths=montecarlo.default_paths):
+    lookback_days = lookback_days or {}
+    tables = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for tf_name, tf_interval in timeframes.items():
+            frames = download_batches(tickers, tf_interval, periods.get(tf_interval, "60d"),
+                                      lookback_days.get(tf_interval))
+            symbols = list(frames)
+            arrays = [np.ascontiguousarray(frames[ticker][scan_columns].iloc[-max(counts):].to_numpy(dtype=np.float64))
+                      for ticker in symbols]
+            rows = []
+            for symbol_rows in executor.map(analyze_symbol, symbols, [tf_name] * len(symbols), arrays,
+                                            [counts] * len(symbols), chunksize=16):
+                rows.extend(symbol_rows)
+            table = pd.DataFrame(rows)
+            if not table.empty:
+                table = add_probabilities(table, bands)
+                if horizons:
+                    closes = {ticker: array[:, scan_columns.index("Close")] for ticker, array in zip(symbols, arrays)}
+                    table = add_horizon_probabilities(table, closes, horizons, bands, model, paths, executor)
+                table = table.sort_values(["Count", rank_by], ascending=[True, False], ignore_index=True)
+            tables[tf_name] = table
+    return tables
@@ -0,0 +1,378 @@
+import json
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+import numpy as np
+from . import analysis
+from . import metrics
+from . import montecarlo
+from . import probkernel
+
+# Long-running analysis daemon. Candle series and option chains stay resident
+# and a background thread refreshes them; computed responses are cached as
+# encoded JSON keyed by request and invalidated when the series they came
+# from changes (new bar or updated close), so repeat queries are a dict
+# lookup. Endpoints (GET, JSON):
+#   /stats/{symbol}/{timeframe}?window=50
+#   /probabilities/{symbol}/{timeframe}?window=50&bands=1.5,2
+#   /horizons/{symbol}/{timeframe}?window=200&horizons=1,5,10&model=bootstrap&paths=10000
+#   /options/{ticker}?period=10
+#   /health, /metrics (Prometheus text)
+refresh_interval = float(os.environ.get("TRADING_SERVER_REFRESH", 30))  # Seconds between candle refreshes
+options_refresh_interval = float(os.environ.get("TRADING_SERVER_OPTIONS_REFRESH", 300))
+history_candles = 1000  # Bars kept per series (largest usable window)
+options_days = 50  # Trading days of chain history kept per ticker
+default_window = 50
+horizon_seed = 0  # Fixed so a cached simulation matches a recomputed one
+max_paths = 100000  # Request limits (a path block is at most max_horizon x chunk_size floats, ~16 MB)
+max_horizon = 500
+max_horizon_count = 20
+max_cache_entries = 10000  # The cache is cleared when it grows past this (many distinct queries)
+
+metrics.help_texts.update({
+    "server_requests_total": "API requests served, by endpoint, status and cache result",
+    "server_request_seconds": "API request handling time",
+    "server_refresh_seconds": "Background refresh time per symbol"
+})
+
+# Error answered with an HTTP status and a JSON message
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# Function to convert results (numpy scalars, tuples, NaN) to JSON-safe values
+def json_safe(value):
+    if isinstance(value, dict):
+        return {str(key): json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [json_safe(item) for item in value]
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        return float(value) if math.isfinite(value) else None
+    return value
+
+# Resident data: candle frames per (symbol, timeframe), option chains per
+# ticker, and the response cache. Frames are replaced whole on refresh, so
+# request threads always see a complete series without locking. Loads of one
+# symbol (first requests and background refreshes) hold that symbol's lock,
+# so two threads never write the same candle store file at once.
+class HotData:
+    def __init__(self, cache_only=False, bands=probkernel.default_bands, api_key=None):
+        self.cache_only = cache_only
+        self.bands = tuple(bands)
+        self.api_key = api_key
+        self.series = {}  # (symbol, timeframe) -> (frame, version)
+        self.chains = {}  # ticker -> (history, current chain, version)
+        self.cache = {}  # request key -> (version, encoded body)
+        self.lock = threading.Lock()  # Guards symbol_locks
+        self.symbol_locks = {}  # symbol or ("options", ticker) -> RLock
+        self.stop_event = threading.Event()
+        self.started = time.time()
+
+    # Function to classify a symbol and validate the timeframe (if given); returns the provider module
+    def provider(self, symbol, timeframe=None):
+        from . import crypto
+        from . import stock
+        module = crypto if symbol in crypto.ticker_map else stock
+        if timeframe is not None and timeframe not in module.timeframes:
+            raise RequestError(404, f"Unknown timeframe {timeframe!r} for {symbol}; "
+                                    f"expected one of {list(module.timeframes)}")
+        return module
+
+    # Function to get the lock serializing loads of one symbol
+    def symbol_lock(self, key):
+        with self.lock:
+            return self.symbol_locks.setdefault(key, threading.RLock())
+
+    # Function to (re)load timeframes of one symbol under its lock
+    def load_symbol(self, symbol, timeframes):
+        with self.symbol_lock(symbol):
+            self.fetch_symbol(symbol, timeframes)
+
+    # Function to refresh the base series of one symbol and derive the
+    # requested timeframes from them (call through load_symbol)
+    def fetch_symbol(self, symbol, timeframes):
+        from . import crypto
+        from . import stock
+        start = time.perf_counter()
+        frames = {}
+        if symbol in crypto.ticker_map:
+            coin, vs_currency = crypto.ticker_map[symbol], symbol.split("-", 1)[1]
+            seconds = {tf: crypto.timeframes[tf] for tf in timeframes}
+            if not self.cache_only:
+                bases = sorted({crypto.base_candidates(s)[-1] for s in seconds.values()})
+                crypto.get_engine().map(crypto.fetch_base, [(coin, vs_currency, base, crypto.base_bars(base, history_candles))
+                                                            for base in bases])
+            for tf in timeframes:
+                frames[tf] = crypto.derive_timeframe(coin, vs_currency, seconds[tf], history_candles)
+        else:
+            # Always refresh the 1m base first: the other timeframes are aggregated from it
+            base = stock.fetch_data(symbol, "60d", stock.base_interval, self.cache_only)
+            for tf in timeframes:
+                if tf == stock.base_interval:
+                    frames[tf] = base
+                else:
+                    frames[tf] = stock.fetch_timeframe(symbol, tf, history_candles, self.cache_only)
+        for tf, frame in frames.items():
+            if frame is not None and not frame.empty:
+                frame = frame.iloc[-history_candles:]
+                self.series[(symbol, tf)] = (frame, (len(frame), frame.index[-1].value, float(frame["Close"].iat[-1])))
+        metrics.observe("server_refresh_seconds", time.perf_counter() - start, symbol=symbol)
+
+    # Function to get a resident series, loading (and tracking) it on first use
+    def get_series(self, symbol, timeframe):
+        self.provider(symbol, timeframe)
+        entry = self.series.get((symbol, timeframe))
+        if entry is None:
+            with self.symbol_lock(symbol):
+                entry = self.series.get((symbol, timeframe))
+                if entry is None:
+                    self.load_symbol(symbol, [timeframe])
+                    entry = self.series.get((symbol, timeframe))
+        if entry is None:
+            raise RequestError(503, f"No candles available for {symbol} {timeframe}")
+        return entry
+
+    # Function to (re)load an option chain history and the current chain under the ticker's lock
+    def load_chain(self, ticker):
+        with self.symbol_lock(("options", ticker)):
+            self.fetch_chain(ticker)
+
+    # Function to fetch an option chain history and the current chain (call through load_chain)
+    def fetch_chain(self, ticker):
+        from . import options
+        start = time.perf_counter()
+        key = self.api_key or options.api_key
+        history = options.fetch_historical_data(ticker, key, options_days, self.cache_only)
+        current = None if self.cache_only else options.fetch_options_data(ticker, key)
+        self.chains[ticker] = (history, current, time.time())
+        metrics.observe("server_refresh_seconds", time.perf_counter() - start, symbol=ticker)
+
+    # Function to get a resident chain, loading it on first use
+    def get_chain(self, ticker):
+        from . import options
+        if ticker not in options.supported_tickers:
+            raise RequestError(404, f"Unsupported ticker {ticker!r}; expected one of {options.supported_tickers}")
+        if ticker not in self.chains:
+            with self.symbol_lock(("options", ticker)):
+                if ticker not in self.chains:
+                    self.load_chain(ticker)
+        return self.chains[ticker]
+
+    # Function to answer from the cache while the version matches, else compute and cache
+    def cached(self, key, version, compute):
+        hit = self.cache.get(key)
+        if hit is not None and hit[0] == version:
+            return hit[1], True
+        body = json.dumps(json_safe(compute()), separators=(",", ":")).encode()
+        if len(self.cache) >= max_cache_entries:
+            self.cache.clear()
+        self.cache[key] = (version, body)
+        return body, False
+
+    # Function to refresh tracked series and chains until stopped
+    def refresh_loop(self):
+        next_options = time.monotonic() + options_refresh_interval
+        while not self.stop_event.wait(refresh_interval):
+            by_symbol = {}
+            for symbol, timeframe in list(self.series):
+                by_symbol.setdefault(symbol, []).append(timeframe)
+            for symbol, timeframes in by_symbol.items():
+                try:
+                    self.load_symbol(symbol, timeframes)
+                except Exception as e:  # Keep serving the previous data
+                    print(f"Error refreshing {symbol}: {e}")
+            if time.monotonic() >= next_options:
+                next_options = time.monotonic() + options_refresh_interval
+                for ticker in list(self.chains):
+                    try:
+                        self.load_chain(ticker)
+                    except Exception as e:
+                        print(f"Error refreshing {ticker} options: {e}")
+
+    def start_refresh(self):
+        thread = threading.Thread(target=self.refresh_loop, name="refresh", daemon=True)
+        thread.start()
+        return thread
+
+# Function to parse an integer query parameter
+def int_param(query, name, default, minimum=1, maximum=None):
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise RequestError(400, f"{name} must be an integer")
+    if value < minimum:
+        raise RequestError(400, f"{name} must be at least {minimum}")
+    if maximum is not None and value > maximum:
+        raise RequestError(400, f"{name} must be at most {maximum}")
+    return value
+
+# Function to parse a comma-separated list query parameter
+def list_param(query, name, default, convert=float):
+    if name not in query:
+        return tuple(default)
+    try:
+        return tuple(convert(item) for item in query[name].split(",") if item)
+    except ValueError:
+        raise RequestError(400, f"{name} must be a comma-separated list of numbers")
+
+# Function to describe the series a response was computed from
+def series_info(symbol, timeframe, frame, window):
+    return {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "window": window,
+        "last_bar": frame.index[-1].isoformat(),
+        "close": frame["Close"].iat[-1]
+    }
+
+# Endpoint handlers: (hot data, path parts, query) -> (body, cache hit)
+def stats_endpoint(hot, parts, query):
+    symbol, timeframe = parts
+    window = int_param(query, "window", default_window, minimum=2)
+    frame, version = hot.get_series(symbol, timeframe)
+    return hot.cached(("stats", symbol, timeframe, window), version, lambda: {
+        **series_info(symbol, timeframe, frame, window),
+        "stats": analysis.calculate_stats(frame, window)
+    })
+
+def probabilities_endpoint(hot, parts, query):
+    symbol, timeframe = parts
+    window = int_param(query, "window", default_window, minimum=2)
+    bands = list_param(query, "bands", hot.bands)
+    frame, version = hot.get_series(symbol, timeframe)
+    return hot.cached(("probabilities", symbol, timeframe, window, bands), version, lambda: {
+        **series_info(symbol, timeframe, frame, window),
+        "probabilities": analysis.calculate_probabilities(frame, window, frame["Close"].iat[-1], bands)
+    })
+
+def horizons_endpoint(hot, parts, query):
+    symbol, timeframe = parts
+    window = int_param(query, "window", 200, minimum=3)
+    horizons = list_param(query, "horizons", montecarlo.default_horizons, int)
+    bands = list_param(query, "bands", hot.bands)
+    model = query.get("model", montecarlo.default_model)
+    paths = int_param(query, "paths", montecarlo.default_paths, maximum=max_paths)
+    if model not in montecarlo.models:
+        raise RequestError(400, f"model must be one of {montecarlo.models}")
+    if not horizons or min(horizons) < 1 or max(horizons) > max_horizon:
+        raise RequestError(400, f"horizons must be bar counts from 1 to {max_horizon}")
+    if len(horizons) > max_horizon_count:
+        raise RequestError(400, f"at most {max_horizon_count} horizons per request")
+    frame, version = hot.get_series(symbol, timeframe)
+    key = ("horizons", symbol, timeframe, window, horizons, bands, model, paths)
+    return hot.cached(key, version, lambda: {
+        **series_info(symbol, timeframe, frame, window),
+        "model": model,
+        "paths": paths,
+        "horizons": analysis.calculate_horizon_probabilities(frame, window, frame["Close"].iat[-1], horizons, bands,
+                                                             model, paths, horizon_seed)
+    })
+
+def options_endpoint(hot, parts, query):
+    from . import options
+    ticker, = parts
+    period = int_param(query, "period", 10)
+    if period > options_days:
+        raise RequestError(400, f"period must be at most {options_days}")
+    history, current, version = hot.get_chain(ticker)
+    if history is None:
+        raise RequestError(503, f"No option chain history available for {ticker}")
+    current_mid = current["mid"].mean() if current is not None else None
+    return hot.cached(("options", ticker, period), version, lambda: {
+        "ticker": ticker,
+        "period": period,
+        "current_mid": current_mid,
+        "stats": options.calculate_stats(history, period),
+        "probabilities": options.calculate_probabilities(history, period, current_mid, hot.bands),
+        "strategies": options.suggest_strategies(current)
+    })
+
+# Endpoint name -> (handler, number of path parts)
+endpoints = {
+    "stats": (stats_endpoint, 2),
+    "probabilities": (probabilities_endpoint, 2),
+    "horizons": (horizons_endpoint, 2),
+    "options": (options_endpoint, 1)
+}
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive for dashboards polling many times a minute
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        endpoint = parts[0] if parts else ""
+        cache = "none"
+        try:
+            if endpoint == "health":
+                hot = self.server.hot
+                self.send_body(200, json.dumps({"status": "ok", "uptime": round(time.time() - hot.started, 1),
+                                                "series": [f"{symbol}/{tf}" for symbol, tf in list(hot.series)],
+                                                "options": list(hot.chains)}).encode())
+            elif endpoint == "metrics":
+                self.send_body(200, metrics.prometheus_text().encode(), "text/plain; version=0.0.4")
+            elif endpoint in endpoints and len(parts) - 1 == endpoints[endpoint][1]:
+                body, hit = endpoints[endpoint][0](self.server.hot, parts[1:], dict(parse_qsl(url.query)))
+                cache = "hit" if hit else "miss"
+                self.send_body(200, body)
+            else:
+                raise RequestError(404, f"Unknown path {url.path}")
+        except RequestError as e:
+            self.send_body(e.status, json.dumps({"error": str(e)}).encode())
+        except Exception as e:
+            print(f"Error serving {self.path}: {e}")
+            self.send_body(500, json.dumps({"error": str(e)}).encode())
+        endpoint = endpoint if endpoint in endpoints or endpoint in ("health", "metrics") else "unknown"
+        metrics.observe("server_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+        metrics.inc("server_requests_total", endpoint=endpoint, status=self.status, cache=cache)
+
+    def send_body(self, status, body, content_type="application/json"):
+        self.status = status
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Requests are counted in the metrics instead
+
+class AnalysisServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, hot, host="127.0.0.1", port=8765):
+        super().__init__((host, port), AnalysisHandler)
+        self.hot = hot
+
+# Function to run the `serve` subcommand
+def run(args):
+    global refresh_interval
+    if args.refresh is not None:
+        refresh_interval = args.refresh
+    hot = HotData(cache_only=args.cache_only, bands=args.bands, api_key=args.api_key)
+    # Preloaded symbols keep every timeframe resident; others load on first request
+    for symbol in args.symbols or []:
+        print(f"Loading {symbol}...")
+        hot.load_symbol(symbol, list(hot.provider(symbol).timeframes))
+    for ticker in args.options or []:
+        print(f"Loading {ticker} options...")
+        hot.get_chain(ticker)
+    server = AnalysisServer(hot, args.host, args.port)
+    hot.start_refresh()
+    host, port = server.server_address[:2]
+    print(f"Serving analysis on http://{host}:{port} (refresh every {refresh_interval:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hot.stop_event.set()
+        server.server_close()
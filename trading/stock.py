@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta, timezone
+from . import backtest
+from . import candlestore
+from . import livefeed
+from . import metrics
+from . import resample
+from . import scanner
+from .analysis import calculate_window_horizon_probabilities, calculate_window_probabilities, calculate_window_stats
+
+# Timeframes
+timeframes = {
+    "1m": "1m",
+    "5m": "5m",
+    "30m": "30m"
+}
+timeframe_seconds = {
+    "1m": 60,
+    "5m": 300,
+    "30m": 1800
+}
+
+# How far back yfinance serves each intraday interval (days)
+max_lookback_days = {
+    "1m": 7,
+    "5m": 60,
+    "30m": 60
+}
+
+# Function to fetch data (cache_only reads the candle store without touching the network)
+def fetch_data(ticker, period, interval, cache_only=False):
+    if cache_only:
+        return candlestore.load_candles("yfinance", ticker, interval, tz="America/New_York")
+    try:
+        import yfinance as yf  # Heavy import; only needed when fetching
+        stock_data = yf.Ticker(ticker)
+        # Adjust period to ensure enough data (yfinance has limits on intraday data)
+        lookback = max_lookback_days.get(interval)
+        if lookback is not None:
+            period = f"{lookback}d"
+
+        # Only request bars from the last stored one onwards (it may still have been forming)
+        last_ts = candlestore.last_timestamp("yfinance", ticker, interval)
+        if last_ts is not None and lookback is not None and \
+                datetime.now(timezone.utc) - datetime.fromtimestamp(last_ts, timezone.utc) > timedelta(days=lookback):
+            last_ts = None  # Gap is older than the provider window; refetch the full period
+        with metrics.timer("stage_seconds", stage="yfinance.history"):
+            if last_ts is not None:
+                df = stock_data.history(start=datetime.fromtimestamp(last_ts, timezone.utc), interval=interval)
+            else:
+                df = stock_data.history(period=period, interval=interval)
+        if df is not None and not df.empty:
+            candlestore.append_candles("yfinance", ticker, interval, df)
+
+        tz = df.index.tz if df is not None and not df.empty else None
+        return candlestore.load_candles("yfinance", ticker, interval, tz=tz or "America/New_York")
+    except Exception as e:
+        print(f"Error fetching data for {interval}: {e}")
+        return None
+
+# Coarser timeframes are aggregated from the stored 1m series once it covers
+# them, instead of being downloaded separately
+base_interval = "1m"
+
+# Function to aggregate a timeframe from the stored 1m series (no network); the
+# bars covering the last max_candles, or all history when max_candles is None
+def derive_data(ticker, interval, max_candles=None):
+    records = candlestore.read_records("yfinance", ticker, base_interval)
+    if records is None:
+        return None
+    ratio = timeframe_seconds[interval] // timeframe_seconds[base_interval]
+    if max_candles is not None:
+        records = records[-(max_candles + 1) * ratio:]
+    return candlestore.records_frame(resample.aggregate(records, timeframe_seconds[interval]), tz="America/New_York")
+
+# Function to get a timeframe's candles: aggregated from the 1m series (fetched
+# beforehand) when it holds max_candles of them, otherwise downloaded
+def fetch_timeframe(ticker, interval, max_candles, cache_only=False):
+    derived = derive_data(ticker, interval, max_candles)
+    if derived is not None and len(derived) >= max_candles:
+        return derived
+    data = fetch_data(ticker, "60d", interval, cache_only)
+    return data if data is not None else derived
+
+# Function to print the analysis of one timeframe
+def print_analysis(tf_name, data, candle_counts, bands, horizons=None, model="bootstrap", paths=10000):
+    print(f"\nTimeframe: {tf_name}")
+    if data is None or data.empty:
+        print("No data available.")
+        return
+    current_close = data["Close"].iloc[-1] if not data.empty else None
+    window_stats = calculate_window_stats(data, candle_counts)
+    window_probs = calculate_window_probabilities(data, candle_counts, current_close, bands)
+    horizon_probs = calculate_window_horizon_probabilities(data, candle_counts, current_close, horizons, bands, model,
+                                                           paths) if horizons else None
+
+    for count in candle_counts:
+        print(f"\nCandle Count: {count}")
+        # Calculate stats
+        stats = window_stats[count]
+        if stats:
+            print("Statistics:")
+            for metric, values in stats.items():
+                print(f"  {metric}:")
+                print(f"    Mean: {values['Mean']:.2f}")
+                print(f"    Median: {values['Median']:.2f}")
+                print(f"    Variance: {values['Variance']:.2f}")
+        else:
+            print("  Insufficient data for stats.")
+
+        # Calculate probabilities
+        probs = window_probs[count]
+        if probs:
+            print("Probabilities:")
+            print(f"  Increase: {probs['Increase']:.2f}%")
+            print(f"  Decrease: {probs['Decrease']:.2f}%")
+            print(f"  Range: {probs['Range']:.2f}%")
+            print(f"  Range Thresholds: {probs['Range_Lower']:.2f} - {probs['Range_Upper']:.2f}")
+            for band, prob_range, lower, upper in probs["Bands"][1:]:
+                print(f"  Range ±{band} std: {prob_range:.2f}% ({lower:.2f} - {upper:.2f})")
+        else:
+            print("  Insufficient data for probabilities.")
+
+        # Simulate multi-bar probabilities
+        if horizon_probs is not None:
+            horizons_result = horizon_probs[count]
+            if horizons_result:
+                print(f"Monte Carlo ({model}, {paths} paths):")
+                for horizon, probs in horizons_result.items():
+                    if probs:
+                        print(f"  {horizon} bars: Increase {probs['Increase']:.2f}%, Decrease {probs['Decrease']:.2f}%, "
+                              f"Range {probs['Range']:.2f}% ({probs['Range_Lower']:.2f} - {probs['Range_Upper']:.2f})")
+            else:
+                print("  Insufficient data for simulation.")
+
+# Function to print the ranked scanner tables
+def print_scan(tables, rank_by, top):
+    for tf_name, table in tables.items():
+        print(f"\nTimeframe: {tf_name}")
+        if table.empty:
+            print("No data available.")
+            continue
+        for count, group in table.groupby("Count", sort=True):
+            print(f"\nCandle Count: {count} (ranked by {rank_by})")
+            columns = ["Ticker", "Close", "Increase", "Decrease", "Range"]
+            columns += [column for column in table.columns if column.endswith(" bars")]  # Monte Carlo horizons
+            print(group.head(top)[columns + ["Close Variance"]]
+                  .to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+# Function to run the `stock` subcommand
+def run(args):
+    stock = args.symbol
+    candle_counts = args.counts
+    if args.scan:
+        print(f"Stock Scan of {len(args.scan)} tickers\n")
+        periods = {interval: f"{days}d" for interval, days in max_lookback_days.items()}
+        print_scan(scanner.scan(args.scan, timeframes, candle_counts, periods, lookback_days=max_lookback_days,
+                                rank_by=args.rank_by, bands=args.bands, horizons=args.horizons, model=args.mc_model,
+                                paths=args.paths), args.rank_by, args.top)
+    elif args.backtest:
+        print(f"Probability Backtest for {stock}\n")
+        series = {}
+        for tf_name, tf_interval in timeframes.items():
+            data = fetch_data(stock, "60d", tf_interval, args.cache_only)
+            if data is not None and not data.empty:
+                series[(stock, tf_name)] = data["Close"].to_numpy()
+        _, reports = backtest.backtest(series, candle_counts, band=args.bands[0])
+        for tf_name, count_reports in reports.items():
+            print(f"\nTimeframe: {tf_name}")
+            for count, report in count_reports.items():
+                backtest.print_report(count, report)
+    elif args.live or args.replay is not None:
+        print(f"Live Stock Analysis for {stock}\n")
+        if args.replay is not None:
+            # Coarser timeframes are aggregated from the stored 1m series, as in the default mode
+            frames = {(stock, tf_name): candlestore.load_candles("yfinance", stock, tf_interval, tz="America/New_York")
+                      if tf_interval == base_interval else derive_data(stock, tf_interval)
+                      for tf_name, tf_interval in timeframes.items()}
+            source = livefeed.ReplaySource(frames, speed=args.replay or None, warmup=max(candle_counts))
+        else:
+            # Poll the 1m series and aggregate the timeframes it covers; poll the others directly
+            fetch_data(stock, "60d", base_interval)
+            covered = []
+            for tf_name, tf_interval in timeframes.items():
+                if tf_interval != base_interval:
+                    frame = derive_data(stock, tf_interval, max(candle_counts))
+                    if frame is not None and len(frame) >= max(candle_counts):
+                        covered.append(tf_name)
+            source = livefeed.PollingSource({
+                (stock, tf_name): (lambda tf_interval=tf_interval: fetch_data(stock, "60d", tf_interval),
+                                   timeframe_seconds[tf_name])
+                for tf_name, tf_interval in timeframes.items() if tf_name not in covered
+            })
+            source = livefeed.ResampledSource(source, {(stock, base_interval): [((stock, tf_name), timeframe_seconds[tf_name])
+                                                                               for tf_name in covered]})
+        livefeed.run_live(source, candle_counts)
+    else:
+        print(f"Stock Analysis for {stock}\n")
+        base = fetch_data(stock, "60d", base_interval, args.cache_only)
+        for tf_name, tf_interval in timeframes.items():
+            data = base if tf_interval == base_interval else \
+                fetch_timeframe(stock, tf_interval, max(candle_counts), args.cache_only)
+            print_analysis(tf_name, data, candle_counts, args.bands, args.horizons, args.mc_model, args.paths)
@@ -0,0 +1,203 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+from . import blackscholes
+
+# Search limits: only liquid contracts, near-term expirations, and short legs
+# in a delta band are considered, and long legs are at most max_width strikes away
+min_volume = 10
+min_days, max_days = 1, 60
+short_delta = (0.15, 0.35)  # |delta| of sold legs (credit spreads, condors, covered calls)
+long_delta = (0.40, 0.60)  # |delta| of bought legs (debit spreads)
+max_width = 5  # Strikes between the two legs of a vertical
+min_loss_fraction = 0.2  # Defined-risk structures must risk at least this share of their width
+condor_legs = 10  # Best credit spreads per side combined into iron condors
+top_n = 5
+
+# Strikes of one side of one expiration, sorted, with the fields the scan needs
+class SideIndex:
+    def __init__(self, df):
+        df = df.sort_values("strike")
+        self.strike = df["strike"].to_numpy(dtype=np.float64)
+        self.mid = df["mid"].to_numpy(dtype=np.float64)
+        self.delta = df["delta"].to_numpy(dtype=np.float64)
+        self.iv = df["iv"].to_numpy(dtype=np.float64)
+
+    def __len__(self):
+        return len(self.strike)
+
+    # Indices whose |delta| lies in a band
+    def in_band(self, band):
+        return np.flatnonzero((np.abs(self.delta) >= band[0]) & (np.abs(self.delta) <= band[1]))
+
+# Chain indexed by expiration, then by side, with strikes sorted
+class ChainIndex:
+    def __init__(self, chain, underlying_price, as_of=None):
+        self.spot = float(underlying_price)
+        as_of = time.time() if as_of is None else as_of
+        liquid = chain[(pd.to_numeric(chain["volume"], errors="coerce") >= min_volume) &
+                       (pd.to_numeric(chain["mid"], errors="coerce") > 0)]
+        self.expirations = {}
+        for expiration, group in liquid.groupby("expiration", sort=True):
+            years = float(blackscholes.year_fractions(np.array([expiration]), as_of)[0])
+            if not min_days <= years * 365 <= max_days:
+                continue
+            sides = group["side"].astype(str).str.lower()
+            calls, puts = SideIndex(group[sides == "call"]), SideIndex(group[sides == "put"])
+            if len(calls) and len(puts):
+                self.expirations[expiration] = (years, calls, puts)
+
+    # At-the-money implied volatility used for the terminal price distribution
+    def atm_vol(self, calls, puts):
+        vols = []
+        for side in (calls, puts):
+            valid = np.flatnonzero(np.isfinite(side.iv))
+            if valid.size:
+                vols.append(side.iv[valid[np.argmin(np.abs(side.strike[valid] - self.spot))]])
+        return float(np.mean(vols)) if vols else np.nan
+
+# Probability that the lognormal terminal price ends above `level`
+def prob_above(spot, level, vol, years, rate=blackscholes.risk_free_rate):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (np.log(spot / level) + (rate - 0.5 * vol * vol) * years) / (vol * np.sqrt(years))
+    return ndtr(z)
+
+# Function to build candidate rows from leg arrays (one entry per candidate)
+def candidates(strategy, expiration, legs, max_loss, max_profit, lower_be, upper_be, pop):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(np.isfinite(max_profit), (pop * max_profit - (1 - pop) * max_loss) / max_loss, np.nan)
+    return pd.DataFrame({
+        "Strategy": strategy,
+        "Expiration": expiration,
+        "Legs": legs,
+        "Max_Loss": max_loss,
+        "Max_Profit": max_profit,
+        "Breakeven_Lower": lower_be,
+        "Breakeven_Upper": upper_be,
+        "PoP": pop * 100,
+        "Score": score
+    })
+
+# Vertical spreads anchored on legs in a delta band; the other leg is 1..max_width
+# strikes further out of the money. Returns (anchor, other) index arrays.
+def vertical_pairs(side, anchors, direction):
+    anchor = np.repeat(anchors, max_width)
+    other = anchor + direction * np.tile(np.arange(1, max_width + 1), len(anchors))
+    valid = (other >= 0) & (other < len(side))
+    return anchor[valid], other[valid]
+
+def scan_expiration(index, expiration, years, calls, puts):
+    spot = index.spot
+    vol = index.atm_vol(calls, puts)
+    frames = []
+
+    # Long straddle at the strike closest to spot listed on both sides
+    common = np.intersect1d(calls.strike, puts.strike)
+    if common.size:
+        strike = common[np.argmin(np.abs(common - spot))]
+        c, p = np.searchsorted(calls.strike, strike), np.searchsorted(puts.strike, strike)
+        cost = np.array([calls.mid[c] + puts.mid[p]])
+        lower, upper = strike - cost, strike + cost
+        pop = 1 - prob_above(spot, lower, vol, years) + prob_above(spot, upper, vol, years)
+        frames.append(candidates("Long Straddle", expiration, [f"+C{strike:g} +P{strike:g}"],
+                                 cost, np.full(1, np.inf), lower, upper, pop))
+
+    # Bull put credit: sell put in the short band, buy a lower put
+    short, long = vertical_pairs(puts, puts.in_band(short_delta), -1)
+    credit = puts.mid[short] - puts.mid[long]
+    width = puts.strike[short] - puts.strike[long]
+    keep = (credit > 0) & (width - credit >= min_loss_fraction * width)  # Near-riskless credits are quote artifacts
+    short, long, credit, width = short[keep], long[keep], credit[keep], width[keep]
+    breakeven = puts.strike[short] - credit
+    put_spreads = candidates("Bull Put Spread", expiration,
+                             [f"-P{a:g} +P{b:g}" for a, b in zip(puts.strike[short], puts.strike[long])],
+                             width - credit, credit, breakeven, np.full(len(short), np.nan),
+                             prob_above(spot, breakeven, vol, years))
+    put_legs = (puts.strike[short], credit, width)
+    frames.append(put_spreads)
+
+    # Bear call credit: sell call in the short band, buy a higher call
+    short, long = vertical_pairs(calls, calls.in_band(short_delta), 1)
+    credit = calls.mid[short] - calls.mid[long]
+    width = calls.strike[long] - calls.strike[short]
+    keep = (credit > 0) & (width - credit >= min_loss_fraction * width)  # Near-riskless credits are quote artifacts
+    short, long, credit, width = short[keep], long[keep], credit[keep], width[keep]
+    breakeven = calls.strike[short] + credit
+    call_spreads = candidates("Bear Call Spread", expiration,
+                              [f"-C{a:g} +C{b:g}" for a, b in zip(calls.strike[short], calls.strike[long])],
+                              width - credit, credit, np.full(len(short), np.nan), breakeven,
+                              1 - prob_above(spot, breakeven, vol, years))
+    call_legs = (calls.strike[short], credit, width)
+    frames.append(call_spreads)
+
+    # Bull call debit: buy call near the money, sell a higher call
+    long, short = vertical_pairs(calls, calls.in_band(long_delta), 1)
+    debit = calls.mid[long] - calls.mid[short]
+    width = calls.strike[short] - calls.strike[long]
+    keep = (debit >= min_loss_fraction * width) & (debit < width)  # Near-free debits are quote artifacts
+    long, short, debit, width = long[keep], short[keep], debit[keep], width[keep]
+    breakeven = calls.strike[long] + debit
+    frames.append(candidates("Bull Call Spread", expiration,
+                             [f"+C{a:g} -C{b:g}" for a, b in zip(calls.strike[long], calls.strike[short])],
+                             debit, width - debit, breakeven, np.full(len(long), np.nan),
+                             prob_above(spot, breakeven, vol, years)))
+
+    # Bear put debit: buy put near the money, sell a lower put
+    long, short = vertical_pairs(puts, puts.in_band(long_delta), -1)
+    debit = puts.mid[long] - puts.mid[short]
+    width = puts.strike[long] - puts.strike[short]
+    keep = (debit >= min_loss_fraction * width) & (debit < width)  # Near-free debits are quote artifacts
+    long, short, debit, width = long[keep], short[keep], debit[keep], width[keep]
+    breakeven = puts.strike[long] - debit
+    frames.append(candidates("Bear Put Spread", expiration,
+                             [f"+P{a:g} -P{b:g}" for a, b in zip(puts.strike[long], puts.strike[short])],
+                             debit, width - debit, np.full(len(long), np.nan), breakeven,
+                             1 - prob_above(spot, breakeven, vol, years)))
+
+    # Iron condor: only the best credit spreads per side are paired
+    best_puts = np.argsort(-put_spreads["Score"].to_numpy())[:condor_legs]
+    best_calls = np.argsort(-call_spreads["Score"].to_numpy())[:condor_legs]
+    if best_puts.size and best_calls.size:
+        p, c = np.repeat(best_puts, best_calls.size), np.tile(best_calls, best_puts.size)
+        put_short, put_credit, put_width = (leg[p] for leg in put_legs)
+        call_short, call_credit, call_width = (leg[c] for leg in call_legs)
+        keep = (put_short < call_short) & \
+            (np.maximum(put_width, call_width) - put_credit - call_credit >= min_loss_fraction * np.maximum(put_width, call_width))
+        p, c = p[keep], c[keep]
+        put_short, put_credit, put_width = put_short[keep], put_credit[keep], put_width[keep]
+        call_short, call_credit, call_width = call_short[keep], call_credit[keep], call_width[keep]
+        credit = put_credit + call_credit
+        lower, upper = put_short - credit, call_short + credit
+        frames.append(candidates("Iron Condor", expiration,
+                                 [f"{a} {b}" for a, b in zip(put_spreads["Legs"].to_numpy()[p],
+                                                             call_spreads["Legs"].to_numpy()[c])],
+                                 np.maximum(put_width, call_width) - credit, credit, lower, upper,
+                                 prob_above(spot, lower, vol, years) - prob_above(spot, upper, vol, years)))
+
+    # Covered call: long 1 share per contract unit, sell an OTM call in the short band
+    short = calls.in_band(short_delta)
+    short = short[calls.strike[short] > spot]
+    premium = calls.mid[short]
+    breakeven = spot - premium
+    frames.append(candidates("Covered Call", expiration, [f"+Stock -C{k:g}" for k in calls.strike[short]],
+                             breakeven, calls.strike[short] - breakeven, breakeven, np.full(len(short), np.nan),
+                             prob_above(spot, breakeven, vol, years)))
+    return [frame for frame in frames if not frame.empty]
+
+# Function to scan a chain for candidate structures. Returns one DataFrame per
+# strategy, best first (by Score, or PoP where profit is unbounded).
+def scan_strategies(chain, underlying_price, as_of=None, n=top_n):
+    index = ChainIndex(chain, underlying_price, as_of)
+    frames = []
+    for expiration, (years, calls, puts) in index.expirations.items():
+        frames.extend(scan_expiration(index, expiration, years, calls, puts))
+    if not frames:
+        return {}
+    table = pd.concat(frames, ignore_index=True)
+    table = table[np.isfinite(table["PoP"]) & (table["Max_Loss"] > 0)]
+    results = {}
+    for strategy, group in table.groupby("Strategy", sort=False):
+        key = "PoP" if group["Score"].isna().all() else "Score"
+        results[strategy] = group.sort_values(key, ascending=False).head(n).reset_index(drop=True)
+    return results
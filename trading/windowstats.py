@@ -0,0 +1,59 @@
+import warnings
+import numpy as np
+
+# Order of the statistics along the last axis of window_stats results
+stat_names = ["Mean", "Median", "Variance"]
+
+# Function to compute mean, median and sample variance of the trailing
+# `window` rows of every column, for all windows in one pass.
+# Returns an array of shape (len(windows), len(columns), 3); windows longer
+# than the data are NaN.
+def window_stats(data, columns, windows):
+    windows = [int(w) for w in windows]
+    results = np.full((len(windows), len(columns), len(stat_names)), np.nan)
+    n = len(data)
+    max_window = min(max(windows, default=0), n)
+    if max_window == 0:
+        return results
+
+    # One contiguous float buffer holding only the rows the largest window needs
+    if isinstance(data, np.ndarray):
+        buf = np.ascontiguousarray(data[n - max_window:], dtype=np.float64)
+    else:
+        buf = np.ascontiguousarray(data[columns].iloc[n - max_window:].to_numpy(dtype=np.float64))
+
+    if np.isnan(buf).any():
+        # Missing values: skip them like pandas does (slower per-window path)
+        with warnings.catch_warnings(), np.errstate(all="ignore"):
+            warnings.simplefilter("ignore", RuntimeWarning)
+            for i, w in enumerate(windows):
+                if w > n or w < 1:
+                    continue
+                view = buf[max_window - w:]
+                results[i, :, 0] = np.nanmean(view, axis=0)
+                results[i, :, 1] = np.nanmedian(view, axis=0)
+                results[i, :, 2] = np.nanvar(view, axis=0, ddof=1)
+        return results
+
+    # Cumulative sums from the newest row backwards give every trailing window's
+    # sum and sum of squares; centering on the mean keeps the variance stable
+    shift = buf.mean(axis=0)
+    centered = buf[::-1] - shift
+    sums = np.cumsum(centered, axis=0)
+    squares = np.cumsum(centered * centered, axis=0)
+    for i, w in enumerate(windows):
+        if w > n or w < 1:
+            continue
+        s = sums[w - 1]
+        results[i, :, 0] = s / w + shift
+        results[i, :, 1] = np.median(buf[max_window - w:], axis=0)
+        if w > 1:
+            results[i, :, 2] = np.maximum(squares[w - 1] - s * s / w, 0) / (w - 1)
+    return results
+
+# Function to turn one window's (columns, 3) block into the nested stats dict
+def stats_dict(block, names):
+    return {
+        name: {stat: block[j, k] for k, stat in enumerate(stat_names)}
+        for j, name in enumerate(names)
+    }